@@ -1,16 +1,56 @@
-from typing import Dict, Type
-from .models.base_embedder import BaseEmbedder
-from .models.text_embedder import TextEmbedder
-from .models.image_embedder import ImageEmbedder
+import asyncio
+import functools
+import logging
+import threading
+from typing import Any, Dict, Final, List, Mapping, Optional, Tuple, Type, cast
+from .core.config import (
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+    ENABLED_MODEL_TYPES,
+    MODEL_CACHE_DIR,
+    WARMUP_MODELS,
+)
+from .models import BaseEmbedder, TextEmbedder, ImageEmbedder, MultimodalEmbedder
+from .models.batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 REGISTERED_MODELS: Dict[str, Type[BaseEmbedder]] = {
     "all-MiniLM-L6-v2": TextEmbedder,
     "google/vit-base-patch16-224": ImageEmbedder,
+    "sentence-transformers/clip-ViT-B-32-multilingual-v1": MultimodalEmbedder,
     # "ViT-L/14": AnotherImageEmbedder,
 }
 
+# (name, class, model_type) for every registered model, resolved once at import.
+_MODELS_META: Final[Tuple[Tuple[str, Type[BaseEmbedder], str], ...]] = tuple(
+    (name, klass, getattr(klass, "model_type", "unknown"))
+    for name, klass in REGISTERED_MODELS.items()
+)
+
+# Registered models whose modality is enabled in this deployment.
+_ENABLED_MODELS: Final[Tuple[str, ...]] = tuple(
+    name for name, _, model_type in _MODELS_META if model_type in ENABLED_MODEL_TYPES
+)
+
 
 LOADED_MODELS: Dict[str, BaseEmbedder] = {}
+# Guards _MODEL_LOCKS; each model then loads under its own lock so different
+# models can initialise in parallel while the same model is never built twice.
+_LOAD_LOCK = threading.Lock()
+_MODEL_LOCKS: Dict[str, threading.Lock] = {}
+
+
+_BATCHERS: Dict[Tuple[str, str], MicroBatcher] = {}
+# Bumped on every LOADED_MODELS insertion; invalidates _MODELS_INFO_CACHE.
+_LOADED_MODELS_VERSION = 0
+_MODELS_INFO_CACHE: Optional[Tuple[int, List[Mapping[str, Any]]]] = None
+
+
+def _get_model_lock(model_name: str) -> threading.Lock:
+    with _LOAD_LOCK:
+        return _MODEL_LOCKS.setdefault(model_name, threading.Lock())
 
 
 def get_embedder_instance(model_name: str) -> BaseEmbedder:
@@ -18,77 +58,192 @@ def get_embedder_instance(model_name: str) -> BaseEmbedder:
     Возвращает инстанс эмбеддера по его имени.
     Осуществляет ленивую загрузку модели, если она еще не была загружена.
     """
-    if model_name not in REGISTERED_MODELS:
+    instance = LOADED_MODELS.get(model_name)
+    if instance is not None:
+        return instance
+
+    EmbedderClass = REGISTERED_MODELS.get(model_name)
+    if EmbedderClass is None:
         raise ValueError(f"Model '{model_name}' is not registered.")
 
-    print(
-        f"[DEBUG app/__init__] Attempting to create instance for model_name: '{model_name}' using class: {REGISTERED_MODELS.get(model_name)}"
+    logger.debug("Getting instance for model %s using %s", model_name, EmbedderClass)
+
+    # Double-checked: another thread may have finished loading while we waited.
+    with _get_model_lock(model_name):
+        instance = LOADED_MODELS.get(model_name)
+        if instance is None:
+            logger.info("Initializing model '%s' for the first time...", model_name)
+            instance = EmbedderClass(
+                model_name=model_name, model_cache_dir=MODEL_CACHE_DIR
+            )
+            LOADED_MODELS[model_name] = instance
+            _bump_loaded_models_version()
+            logger.info("Model '%s' initialized.", model_name)
+    return instance
+
+
+def _get_embedder_or_none(model_name: str) -> Optional[BaseEmbedder]:
+    """
+    Returns the shared embedder instance, or None if it is disabled or failed to load.
+    Routers translate None into a 503 response.
+    """
+    if model_name not in _ENABLED_MODELS:
+        logger.debug("Model %s is disabled in this deployment.", model_name)
+        return None
+    try:
+        return get_embedder_instance(model_name)
+    except Exception as e:
+        logger.error("Failed to get embedder instance for model %s: %s", model_name, e)
+        return None
+
+
+def get_text_embedder() -> Optional[TextEmbedder]:
+    """FastAPI dependency returning the shared default text embedder."""
+    return cast(Optional[TextEmbedder], _get_embedder_or_none("all-MiniLM-L6-v2"))
+
+
+def get_image_embedder() -> Optional[ImageEmbedder]:
+    """FastAPI dependency returning the shared default image embedder."""
+    return cast(
+        Optional[ImageEmbedder], _get_embedder_or_none("google/vit-base-patch16-224")
     )
-    if model_name == "google/vit-base-patch16-224":
-        print(
-            f"[DEBUG app/__init__] Matched image model: '{model_name}'. Will use ImageEmbedder."
+
+
+def get_multimodal_embedder() -> Optional[MultimodalEmbedder]:
+    """FastAPI dependency returning the shared default multimodal embedder."""
+    return cast(
+        Optional[MultimodalEmbedder],
+        _get_embedder_or_none("sentence-transformers/clip-ViT-B-32-multilingual-v1"),
+    )
+
+
+def get_batcher(embedder: BaseEmbedder, modality: str = "default") -> MicroBatcher:
+    """
+    Returns the shared micro-batcher that feeds `embedder.get_embeddings`.
+    Models accepting several input kinds use one batcher per `modality`.
+    """
+    key = (embedder.model_name, modality)
+    batcher = _BATCHERS.get(key)
+    if batcher is None:
+        batcher = _BATCHERS.setdefault(
+            key,
+            MicroBatcher(
+                embedder.get_embeddings,
+                max_batch_size=BATCH_MAX_SIZE,
+                max_wait_ms=BATCH_MAX_WAIT_MS,
+            ),
         )
+    return batcher
+
+
+async def stop_batchers() -> None:
+    for batcher in _BATCHERS.values():
+        await batcher.stop()
 
-    if model_name not in LOADED_MODELS:
-        print(f"Initializing model '{model_name}' for the first time...")
-        EmbedderClass = REGISTERED_MODELS[model_name]
-        LOADED_MODELS[model_name] = EmbedderClass(model_name=model_name)
-        print(f"Model '{model_name}' initialized.")
-    return LOADED_MODELS[model_name]
+
+def _find_default_model_name(base_class: Type[BaseEmbedder], fallback: str) -> str:
+    return next(
+        (
+            name
+            for name, klass, _ in _MODELS_META
+            if issubclass(klass, base_class)
+        ),
+        fallback,
+    )
 
 
+@functools.lru_cache(maxsize=1)
 def get_default_text_model_name() -> str:
-    for name, klass in REGISTERED_MODELS.items():
-        if klass.mro()[1] == TextEmbedder or (
-            hasattr(klass, "model_type") and klass.model_type == "text"
-        ):
-            if hasattr(klass("", model_type="text"), "model_type") and klass("", model_type="text").model_type == "text":  # type: ignore
-                return name
-    return "all-MiniLM-L6-v2"
+    return _find_default_model_name(TextEmbedder, "all-MiniLM-L6-v2")
 
 
+@functools.lru_cache(maxsize=1)
 def get_default_image_model_name() -> str:
-    for name, klass in REGISTERED_MODELS.items():
-        if klass.mro()[1] == ImageEmbedder or (
-            hasattr(klass, "model_type") and klass.model_type == "image"
-        ):
-            if hasattr(klass("", model_type="image"), "model_type") and klass("", model_type="image").model_type == "image":  # type: ignore
-                return name
-    return "google/vit-base-patch16-224"
-
-
-def get_available_models_info():
-    infos = []
-    for name, klass in REGISTERED_MODELS.items():
-        try:
-            instance = get_embedder_instance(name)
-            infos.append(instance.get_model_info())
-        except Exception as e:
-            print(f"Could not get info for model {name} due to init error: {e}")
-            model_type_from_class = "unknown"
-            if hasattr(klass, "model_type"):
-                model_type_from_class = klass.model_type
-            elif "TextEmbedder" in str(klass):
-                model_type_from_class = "text"
-            elif "ImageEmbedder" in str(klass):
-                model_type_from_class = "image"
+    return _find_default_model_name(ImageEmbedder, "google/vit-base-patch16-224")
+
+
+def _bump_loaded_models_version() -> None:
+    global _LOADED_MODELS_VERSION
+    _LOADED_MODELS_VERSION += 1
+
+
+def get_loaded_models_version() -> int:
+    """Changes whenever a model is loaded; lets callers cache derived data."""
+    return _LOADED_MODELS_VERSION
 
+
+def get_available_models_info() -> List[Mapping[str, Any]]:
+    """
+    Returns metadata for every enabled model without loading any of them.
+    Already loaded instances report their live info; the rest fall back to
+    class-level metadata. The result is cached until another model is loaded.
+    """
+    global _MODELS_INFO_CACHE
+    version = _LOADED_MODELS_VERSION
+    cached = _MODELS_INFO_CACHE
+    if cached is not None and cached[0] == version:
+        return list(cached[1])
+
+    infos: List[Mapping[str, Any]] = []
+    for name, klass, model_type in _MODELS_META:
+        if name not in _ENABLED_MODELS:
+            continue
+        instance = LOADED_MODELS.get(name)
+        if instance is not None:
+            infos.append(instance.model_info)
+        else:
             infos.append(
                 {
                     "model_name": name,
-                    "model_type": model_type_from_class,
-                    "description": f"Error loading/initializing: {str(e)}",
+                    "model_type": model_type,
+                    "description": klass.description,
+                    "dim": klass.default_dimension,
                 }
             )
 
-    return infos
+    _MODELS_INFO_CACHE = (version, infos)
+    return list(infos)
+
+
+def _should_warmup(model_name: str) -> bool:
+    setting = WARMUP_MODELS.strip()
+    if setting.lower() == "all":
+        return True
+    if setting.lower() in ("", "none"):
+        return False
+    return model_name in {name.strip() for name in setting.split(",")}
+
 
+def _preload_model(model_name: str) -> Optional[str]:
+    """Loads and optionally warms up a model. Returns an error message on failure."""
+    try:
+        instance = get_embedder_instance(model_name)
+    except Exception as e:
+        logger.error("Failed to preload model %s: %s", model_name, e)
+        return f"failed to load: {e}"
 
-def preload_models():
-    print("Preloading models...")
-    for model_name in REGISTERED_MODELS.keys():
+    if _should_warmup(model_name):
         try:
-            get_embedder_instance(model_name)
+            instance.warmup()
+            logger.info("Model '%s' warmed up.", model_name)
         except Exception as e:
-            print(f"Failed to preload model {model_name}: {e}")
-    print("Model preloading complete.")
+            logger.error("Failed to warm up model %s: %s", model_name, e)
+            return f"failed to warm up: {e}"
+    return None
+
+
+async def preload_models() -> Dict[str, str]:
+    """
+    Loads (and warms up) all enabled models concurrently, one worker thread each.
+    Returns a mapping of model name to error message for models that failed.
+    """
+    logger.info("Preloading models...")
+    model_names = list(_ENABLED_MODELS)
+    errors = await asyncio.gather(
+        *(asyncio.to_thread(_preload_model, name) for name in model_names)
+    )
+    failures = {
+        name: error for name, error in zip(model_names, errors) if error is not None
+    }
+    logger.info("Model preloading complete.")
+    return failures
@@ -0,0 +1,39 @@
+from typing import List
+from fastapi import HTTPException, UploadFile
+from app.core.config import MAX_BATCH_TEXTS, MAX_IMAGE_BYTES, MAX_TEXT_CHARS
+
+
+def check_text_input(text: str) -> None:
+    """Rejects blank or oversized text before it reaches the model."""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text must be non-empty.")
+    if len(text) > MAX_TEXT_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Text exceeds the maximum length of {MAX_TEXT_CHARS} characters.",
+        )
+
+
+def check_text_batch(texts: List[str]) -> None:
+    """Rejects oversized batches, then checks every text in it."""
+    if len(texts) > MAX_BATCH_TEXTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {MAX_BATCH_TEXTS} texts.",
+        )
+    for text in texts:
+        check_text_input(text)
+
+
+def check_upload_size(upload: UploadFile) -> None:
+    """Rejects uploads larger than MAX_IMAGE_BYTES without reading them."""
+    size = upload.size
+    if size is None:
+        upload.file.seek(0, 2)
+        size = upload.file.tell()
+        upload.file.seek(0)
+    if size > MAX_IMAGE_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image exceeds the maximum size of {MAX_IMAGE_BYTES} bytes.",
+        )
@@ -1,31 +1,52 @@
 import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body
+from fastapi.responses import ORJSONResponse
+import numpy as np
 from app.schemas import (
     ImageUrlRequest,
+    EmbeddingDType,
+    EmbeddingEncoding,
     EmbeddingResponse,
 )
-from app.models.image_embedder import ImageEmbedder
+from app.models import ImageEmbedder
+from app.models.image_embedder import ImageSource
 from app.auth import get_api_key
+from app.api.v1._shared import check_upload_size
+from app.core.cache import EMBEDDING_CACHE, content_digest
+from app.core.encoding import encode_embedding
+from app.core.http import fetch_bytes
+from app.core.inference import run_inference
+from app.core.singleflight import SingleFlight
+from app import get_batcher, get_image_embedder
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-try:
-    print(
-        "[DEBUG app/api/v1/image.py] About to instantiate ImageEmbedder for the router."
-    )
-    image_embedder = ImageEmbedder()
-    print(
-        f"[DEBUG app/api/v1/image.py] Instantiated ImageEmbedder. Model name: {image_embedder.model_name}, Loaded: {image_embedder.model is not None}"
-    )
-    logger.info(
-        f"ImageEmbedder loaded successfully with model: {image_embedder.model_name} and dimension: {image_embedder.dimension}"
-    )
-except Exception as e:
-    logger.error(f"Failed to initialize ImageEmbedder: {e}", exc_info=True)
-    image_embedder = None
+# Concurrent requests for the same (model, URL) share one download + encode.
+# Nothing is kept once the flight lands: the content behind a URL can change,
+# so later requests download again and hit the content-keyed embedding cache.
+_URL_FLIGHTS = SingleFlight()
+
+
+async def _embed_image(
+    image_embedder: ImageEmbedder, source: ImageSource, digest: bytes
+) -> np.ndarray:
+    """Returns the cached embedding for this image content, or decodes and embeds it."""
+    cache_key = EMBEDDING_CACHE.make_key(image_embedder.model_name, "image", digest)
+    embedding = await EMBEDDING_CACHE.aget(cache_key)
+    if embedding is None:
+        image = await run_inference(image_embedder.load_image, source)
+        embedding = await get_batcher(image_embedder).submit(image)
+        await EMBEDDING_CACHE.aput(cache_key, embedding)
+    return embedding
+
+
+async def _embed_url(image_embedder: ImageEmbedder, url: str) -> np.ndarray:
+    image_bytes = await fetch_bytes(url)
+    # Keyed by content, so the same image behind different URLs is embedded once.
+    return await _embed_image(image_embedder, image_bytes, content_digest(image_bytes))
 
 
 @router.post("/embeddings/image/upload", response_model=EmbeddingResponse)
@@ -35,7 +56,10 @@ async def create_image_embedding_upload_v1(
         None,
         description="Optional: model name for images. If not specified, the default model is used.",
     ),
+    dtype: EmbeddingDType = Body("float32"),
+    encoding: EmbeddingEncoding = Body("list"),
     api_key: str = Depends(get_api_key),
+    image_embedder: Optional[ImageEmbedder] = Depends(get_image_embedder),
 ):
     """
     Creates an embedding for the uploaded image.
@@ -56,20 +80,32 @@ async def create_image_embedding_upload_v1(
         )
 
     try:
-        contents = await image_file.read()
-        if not contents:
+        # The upload is already spooled by Starlette; peek one byte to reject empty
+        # files and hand the file object to the embedder without reading it into RAM.
+        image_file.file.seek(0)
+        if not image_file.file.read(1):
             raise HTTPException(
                 status_code=400, detail="No image file content provided."
             )
+        image_file.file.seek(0)
+        check_upload_size(image_file)
 
-        embedding = image_embedder.get_embedding(contents)
-        return EmbeddingResponse(
-            embedding=embedding,
-            model_used=image_embedder.model_name,
-            dim=image_embedder.dimension,
+        digest = await run_inference(content_digest, image_file.file)
+        embedding = await _embed_image(image_embedder, image_file.file, digest)
+        return ORJSONResponse(
+            {
+                "embedding": encode_embedding(embedding, dtype, encoding),
+                "embeddings": None,
+                "model_used": image_embedder.model_name,
+                "dim": image_embedder.dimension,
+                "dtype": dtype,
+                "encoding": encoding,
+            }
         )
+    except HTTPException:
+        raise
     except ValueError as ve:
-        logger.error(f"Validation error in image upload embedding: {ve}", exc_info=True)
+        logger.warning("Validation error in image upload embedding: %s", ve)
         raise HTTPException(status_code=400, detail=str(ve))
     except RuntimeError as re:
         logger.error(f"Runtime error in image upload embedding: {re}", exc_info=True)
@@ -93,7 +129,9 @@ async def create_image_embedding_upload_v1(
     response_model=EmbeddingResponse,
 )
 async def create_image_embedding_url_v1(
-    request: ImageUrlRequest, api_key: str = Depends(get_api_key)
+    request: ImageUrlRequest,
+    api_key: str = Depends(get_api_key),
+    image_embedder: Optional[ImageEmbedder] = Depends(get_image_embedder),
 ):
     """
     Creates an embedding for an image from a URL.
@@ -114,14 +152,24 @@ async def create_image_embedding_url_v1(
         )
 
     try:
-        embedding = image_embedder.get_embedding(request.url)
-        return EmbeddingResponse(
-            embedding=embedding,
-            model_used=image_embedder.model_name,
-            dim=image_embedder.dimension,
+        embedding = await _URL_FLIGHTS.do(
+            (image_embedder.model_name, request.url),
+            lambda: _embed_url(image_embedder, request.url),
+        )
+        return ORJSONResponse(
+            {
+                "embedding": encode_embedding(
+                    embedding, request.dtype, request.encoding
+                ),
+                "embeddings": None,
+                "model_used": image_embedder.model_name,
+                "dim": image_embedder.dimension,
+                "dtype": request.dtype,
+                "encoding": request.encoding,
+            }
         )
     except ValueError as ve:
-        logger.error(f"Validation error in image URL embedding: {ve}", exc_info=True)
+        logger.warning("Validation error in image URL embedding: %s", ve)
         raise HTTPException(status_code=400, detail=str(ve))
     except RuntimeError as re:
         logger.error(f"Runtime error in image URL embedding: {re}", exc_info=True)
@@ -1,100 +1,44 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import Optional, Tuple
+import orjson
+from fastapi import APIRouter, Depends, Response
+from fastapi.encoders import jsonable_encoder
 from app.schemas import (
     ModelInfo,
     AvailableModelsResponse,
 )
-from app.models.text_embedder import TextEmbedder
-from app.models.image_embedder import ImageEmbedder
-from app.models.multimodal_embedder import MultimodalEmbedder
 from app.auth import get_api_key
+from app import get_available_models_info, get_loaded_models_version
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-try:
-    text_embedder_instance = TextEmbedder()
-    logger.info(
-        f"TextEmbedder loaded for models endpoint: {text_embedder_instance.model_name}"
-    )
-except Exception as e:
-    logger.error(
-        f"Failed to initialize TextEmbedder for models endpoint: {e}", exc_info=True
-    )
-    text_embedder_instance = None
+# (loaded models version, serialized AvailableModelsResponse)
+_RESPONSE_CACHE: Optional[Tuple[int, bytes]] = None
 
-try:
-    image_embedder_instance = ImageEmbedder()
-    logger.info(
-        f"ImageEmbedder loaded for models endpoint: {image_embedder_instance.model_name}"
-    )
-except Exception as e:
-    logger.error(
-        f"Failed to initialize ImageEmbedder for models endpoint: {e}", exc_info=True
-    )
-    image_embedder_instance = None
 
-try:
-    multimodal_embedder_instance = MultimodalEmbedder()
-    logger.info(
-        f"MultimodalEmbedder loaded for models endpoint: {multimodal_embedder_instance.model_name}"
-    )
-except Exception as e:
-    logger.error(
-        f"Failed to initialize MultimodalEmbedder for models endpoint: {e}",
-        exc_info=True,
+def _render_models_response() -> bytes:
+    models_info_list = [ModelInfo(**info) for info in get_available_models_info()]
+
+    if not models_info_list:
+        logger.error("No models are registered or enabled.")
+
+    return orjson.dumps(
+        jsonable_encoder(AvailableModelsResponse(models=models_info_list))
     )
-    multimodal_embedder_instance = None
 
 
 @router.get("/models", response_model=AvailableModelsResponse)
 async def list_available_models_v1(api_key: str = Depends(get_api_key)):
     """
-    Returns a list of available (default loaded) models and their types.
+    Returns a list of the models enabled in this deployment and their types.
+    Uses registry metadata only, so it never triggers a model load. The
+    serialized body is reused until another model finishes loading.
     """
-    models_info_list: List[ModelInfo] = []
-
-    if text_embedder_instance:
-        models_info_list.append(
-            ModelInfo(
-                model_name=text_embedder_instance.model_name,
-                model_type="text",
-                description=getattr(text_embedder_instance, "description", "N/A"),
-            )
-        )
-    else:
-        logger.warning("Text embedder instance not available for /models endpoint.")
-
-    if image_embedder_instance:
-        models_info_list.append(
-            ModelInfo(
-                model_name=image_embedder_instance.model_name,
-                model_type="image",
-                description=getattr(image_embedder_instance, "description", "N/A"),
-            )
-        )
-    else:
-        logger.warning("Image embedder instance not available for /models endpoint.")
-
-    if multimodal_embedder_instance:
-        models_info_list.append(
-            ModelInfo(
-                model_name=multimodal_embedder_instance.model_name,
-                model_type="multimodal",
-                description=getattr(multimodal_embedder_instance, "description", "N/A"),
-            )
-        )
-    else:
-        logger.warning(
-            "Multimodal embedder instance not available for /models endpoint."
-        )
-
-    if not models_info_list:
-        logger.error(
-            "No models are available as both text and image embedders failed to load."
-        )
-        pass
-
-    return AvailableModelsResponse(models=models_info_list)
+    global _RESPONSE_CACHE
+    version = get_loaded_models_version()
+    cached = _RESPONSE_CACHE
+    if cached is None or cached[0] != version:
+        cached = _RESPONSE_CACHE = (version, _render_models_response())
+    return Response(content=cached[1], media_type="application/json")
@@ -1,14 +1,25 @@
 import logging
+import re
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from typing import List, Union, Optional
-from pydantic import BaseModel, HttpUrl, Field
+from fastapi.responses import ORJSONResponse
+import numpy as np
+from typing import Union, Optional
 from PIL import (
     Image,
 )
 
-from app.models.multimodal_embedder import MultimodalEmbedder
-from app.auth import get_api_key 
+from app.models import MultimodalEmbedder
+from app.auth import get_api_key
+from app.api.v1._shared import check_text_input, check_upload_size
+from app.core.cache import EMBEDDING_CACHE, content_digest
+from app.core.encoding import encode_embedding
+from app.core.http import fetch_bytes
+from app.core.inference import run_inference
+from app.core.singleflight import SingleFlight
+from app import get_batcher, get_multimodal_embedder
 from app.schemas import (
+    EmbeddingDType,
+    EmbeddingEncoding,
     EmbeddingResponse,
 ) 
 
@@ -16,17 +27,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-try:
-    multimodal_embedder = MultimodalEmbedder()
-    logger.info(
-        f"MultimodalEmbedder loaded for /v1/multimodal/embed endpoint: {multimodal_embedder.model_name}"
-    )
-except Exception as e:
-    logger.error(
-        f"Failed to initialize MultimodalEmbedder for /v1/multimodal/embed endpoint: {e}",
-        exc_info=True,
-    )
-    multimodal_embedder = None
+# Concurrent requests for the same image URL share one download.
+_DOWNLOADS = SingleFlight()
+
+# Cheap syntactic check; malformed hosts still fail at download time with a 400.
+_URL_RE = re.compile(r"^https?://[^\s/?#]+[^\s]*$", re.IGNORECASE)
 
 
 @router.post("/multimodal/embed", response_model=EmbeddingResponse)
@@ -34,7 +39,14 @@ async def get_multimodal_embedding_v1(
     text: Optional[str] = Form(None, description="Text to embed."),
     image_url: Optional[str] = Form(None, description="URL of the image to embed."),
     image_file: Optional[UploadFile] = File(None, description="Image file to embed."),
+    dtype: EmbeddingDType = Form("float32", description="float32 or float16."),
+    encoding: EmbeddingEncoding = Form(
+        "list", description="list (JSON floats) or base64 (raw little-endian buffer)."
+    ),
     api_key: str = Depends(get_api_key),
+    multimodal_embedder: Optional[MultimodalEmbedder] = Depends(
+        get_multimodal_embedder
+    ),
 ):
     """
     Generates an embedding for text or an image using a multimodal model.
@@ -63,26 +75,38 @@ async def get_multimodal_embedding_v1(
             detail="Please provide exactly one of: 'text', 'image_url', or 'image_file'.",
         )
 
+    if is_text_provided:
+        check_text_input(text)
+
     try:
-        embedding_input: Union[str, Image.Image]
+        embedding_input: Union[str, Image.Image, None] = None
+        embedding_vector: Optional[np.ndarray] = None
+        model_name = multimodal_embedder.model_name
 
         if is_text_provided:
             embedding_input = text
+            cache_key = EMBEDDING_CACHE.make_key(
+                model_name, "text", content_digest(text)
+            )
+            embedding_vector = await EMBEDDING_CACHE.aget(cache_key)
             logger.info(f"Processing multimodal embedding for text: {text[:50]}...")
         elif is_image_url_provided:
-            try:
-                valid_image_url = HttpUrl(image_url)
-            except Exception:
-                logger.error(f"Invalid URL format provided for image_url: {image_url}")
+            if not _URL_RE.match(image_url):
+                logger.warning("Invalid URL format provided for image_url: %s", image_url)
                 raise HTTPException(
                     status_code=400,
                     detail=f"Invalid URL format provided for image_url: {image_url}",
                 )
 
-            pil_image = multimodal_embedder._load_image_from_source(
-                str(valid_image_url)
+            image_bytes = await _DOWNLOADS.do(image_url, lambda: fetch_bytes(image_url))
+            cache_key = EMBEDDING_CACHE.make_key(
+                model_name, "image", content_digest(image_bytes)
             )
-            embedding_input = pil_image
+            embedding_vector = await EMBEDDING_CACHE.aget(cache_key)
+            if embedding_vector is None:
+                embedding_input = await run_inference(
+                    multimodal_embedder._load_image_from_source, image_bytes
+                )
             logger.info(f"Processing multimodal embedding for image URL: {image_url}")
         elif is_image_file_provided:
             if not image_file.content_type or not image_file.content_type.startswith(
@@ -93,10 +117,18 @@ async def get_multimodal_embedding_v1(
                     status_code=400,
                     detail=f"Invalid image file type: {image_file.content_type}. Please upload a valid image (e.g., JPEG, PNG).",
                 )
-            image_bytes = await image_file.read()
-            await image_file.close()
-            pil_image = multimodal_embedder._load_image_from_source(image_bytes)
-            embedding_input = pil_image
+            # Hash and decode straight from the spooled upload instead of reading it into memory first.
+            try:
+                check_upload_size(image_file)
+                digest = await run_inference(content_digest, image_file.file)
+                cache_key = EMBEDDING_CACHE.make_key(model_name, "image", digest)
+                embedding_vector = await EMBEDDING_CACHE.aget(cache_key)
+                if embedding_vector is None:
+                    embedding_input = await run_inference(
+                        multimodal_embedder._load_image_from_source, image_file.file
+                    )
+            finally:
+                await image_file.close()
             logger.info(
                 f"Processing multimodal embedding for uploaded image file: {image_file.filename} (type: {image_file.content_type})"
             )
@@ -106,22 +138,30 @@ async def get_multimodal_embedding_v1(
                 detail="No input provided. Please provide 'text', 'image_url', or 'image_file'.",
             )
 
-        embedding_vector = multimodal_embedder.get_embedding(embedding_input)
+        if embedding_vector is None:
+            modality = "image" if isinstance(embedding_input, Image.Image) else "text"
+            embedding_vector = await get_batcher(multimodal_embedder, modality).submit(
+                embedding_input
+            )
+            await EMBEDDING_CACHE.aput(cache_key, embedding_vector)
 
         logger.info(
             f"Successfully generated multimodal embedding of dimension {len(embedding_vector)} for model {multimodal_embedder.model_name}"
         )
 
-        return EmbeddingResponse(
-            model_name=multimodal_embedder.model_name,
-            model_type="multimodal",
-            embedding=embedding_vector,
-            model_used=multimodal_embedder.model_name,
-            dim=multimodal_embedder.dimension,
+        return ORJSONResponse(
+            {
+                "embedding": encode_embedding(embedding_vector, dtype, encoding),
+                "embeddings": None,
+                "model_used": multimodal_embedder.model_name,
+                "dim": multimodal_embedder.dimension,
+                "dtype": dtype,
+                "encoding": encoding,
+            }
         )
 
     except ValueError as ve:
-        logger.error(f"ValueError during multimodal embedding: {ve}", exc_info=True)
+        logger.warning("ValueError during multimodal embedding: %s", ve)
         raise HTTPException(status_code=400, detail=str(ve))
     except RuntimeError as re:
         logger.error(
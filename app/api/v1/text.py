@@ -1,32 +1,96 @@
 import logging
+from typing import AsyncIterator, List, Optional
+import numpy as np
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.schemas import (
     TextRequest,
     EmbeddingResponse,
 )
-from app.models.text_embedder import TextEmbedder
+from app.models import TextEmbedder
 from app.auth import get_api_key
+from app.api.v1._shared import check_text_batch
+from app.core.cache import EMBEDDING_CACHE, content_digest
+from app.core.encoding import encode_embedding
+from app.core.inference import run_inference
+from app import get_batcher, get_text_embedder
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-try:
-    text_embedder = TextEmbedder()
-    logger.info(
-        f"TextEmbedder loaded successfully with model: {text_embedder.model_name} and dimension: {text_embedder.dimension}"
-    )
-except Exception as e:
-    logger.error(f"Failed to initialize TextEmbedder: {e}", exc_info=True)
-    text_embedder = None
+# Number of texts computed per step when streaming a batched response.
+_STREAM_CHUNK_SIZE = 64
 
 
-@router.post("/embeddings/text", response_model=EmbeddingResponse)
+async def _embed_texts(
+    text_embedder: TextEmbedder, texts: List[str]
+) -> List[np.ndarray]:
+    """
+    Embeds a client-supplied batch. Cached texts are served from the cache and
+    the rest go to the model in a single get_embeddings call.
+    """
+    keys = [
+        EMBEDDING_CACHE.make_key(text_embedder.model_name, "text", content_digest(text))
+        for text in texts
+    ]
+    embeddings = await EMBEDDING_CACHE.aget_many(keys)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        computed = await run_inference(
+            text_embedder.get_embeddings, [texts[i] for i in missing]
+        )
+        for i, embedding in zip(missing, computed):
+            embeddings[i] = embedding
+        await EMBEDDING_CACHE.aput_many([(keys[i], embeddings[i]) for i in missing])
+    return embeddings
+
+
+async def _stream_embeddings(
+    text_embedder: TextEmbedder, request: TextRequest
+) -> AsyncIterator[bytes]:
+    """
+    Yields one NDJSON line per text, {"i": index, "embedding": ...}, computing
+    the batch in chunks so the first lines go out before the last chunk is done.
+    """
+    texts = request.text
+    for start in range(0, len(texts), _STREAM_CHUNK_SIZE):
+        try:
+            embeddings = await _embed_texts(
+                text_embedder, texts[start : start + _STREAM_CHUNK_SIZE]
+            )
+        except Exception as e:
+            # Headers are already sent, so the error is reported in-band.
+            logger.error(f"Error while streaming text embeddings: {e}", exc_info=True)
+            yield orjson.dumps({"i": start, "error": str(e)}) + b"\n"
+            return
+        for offset, embedding in enumerate(embeddings):
+            yield orjson.dumps(
+                {
+                    "i": start + offset,
+                    "embedding": encode_embedding(
+                        embedding, request.dtype, request.encoding
+                    ),
+                },
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            ) + b"\n"
+
+
+@router.post(
+    "/embeddings/text",
+    response_model=EmbeddingResponse,
+    response_model_exclude_none=True,
+)
 async def create_text_embedding_v1(
-    request: TextRequest, api_key: str = Depends(get_api_key)
+    request: TextRequest,
+    api_key: str = Depends(get_api_key),
+    text_embedder: Optional[TextEmbedder] = Depends(get_text_embedder),
 ):
     """
     Creates an embedding for the given text using the pre-loaded text model.
+    A list of texts is embedded in one forward pass and returned in `embeddings`,
+    or streamed back as NDJSON when `stream` is set.
     The `model_name` field in the request is currently ignored by this endpoint.
     """
     if text_embedder is None:
@@ -42,16 +106,59 @@ async def create_text_embedding_v1(
             "The requested model_name is ignored."
         )
 
+    texts = request.text if isinstance(request.text, list) else [request.text]
+    check_text_batch(texts)
+
     try:
-        embedding = text_embedder.get_embedding(request.text)
+        if isinstance(request.text, list):
+            if not request.text:
+                raise HTTPException(
+                    status_code=400, detail="The list of texts must not be empty."
+                )
+            if request.stream:
+                return StreamingResponse(
+                    _stream_embeddings(text_embedder, request),
+                    media_type="application/x-ndjson",
+                )
+            embeddings = await _embed_texts(text_embedder, request.text)
+            # Returned directly so orjson serializes the numpy vectors without
+            # building Python float lists; `response_model` only documents the shape.
+            return ORJSONResponse(
+                {
+                    "embeddings": [
+                        encode_embedding(embedding, request.dtype, request.encoding)
+                        for embedding in embeddings
+                    ],
+                    "model_used": text_embedder.model_name,
+                    "dim": text_embedder.dimension,
+                    "dtype": request.dtype,
+                    "encoding": request.encoding,
+                }
+            )
+
+        cache_key = EMBEDDING_CACHE.make_key(
+            text_embedder.model_name, "text", content_digest(request.text)
+        )
+        embedding = await EMBEDDING_CACHE.aget(cache_key)
+        if embedding is None:
+            embedding = await get_batcher(text_embedder).submit(request.text)
+            await EMBEDDING_CACHE.aput(cache_key, embedding)
 
-        return EmbeddingResponse(
-            embedding=embedding,
-            model_used=text_embedder.model_name,
-            dim=text_embedder.dimension,
+        return ORJSONResponse(
+            {
+                "embedding": encode_embedding(
+                    embedding, request.dtype, request.encoding
+                ),
+                "model_used": text_embedder.model_name,
+                "dim": text_embedder.dimension,
+                "dtype": request.dtype,
+                "encoding": request.encoding,
+            }
         )
+    except HTTPException:
+        raise
     except ValueError as ve:
-        logger.error(f"Validation error in text embedding: {ve}", exc_info=True)
+        logger.warning("Validation error in text embedding: %s", ve)
         raise HTTPException(status_code=400, detail=str(ve))
     except RuntimeError as re:
         logger.error(f"Runtime error in text embedding: {re}", exc_info=True)
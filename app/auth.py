@@ -1,5 +1,8 @@
+import hashlib
+import hmac
 import os
-from typing import List, Optional
+import re
+from typing import FrozenSet
 
 from fastapi import HTTPException, Security
 from fastapi.security import APIKeyHeader
@@ -12,17 +15,46 @@ api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=True)
 
 
 raw_keys = os.getenv("VALID_API_KEYS", "")
-VALID_API_KEYS: List[str] = [
-    key.strip() for key in raw_keys.replace(",", " ").split() if key.strip()
-]
+VALID_API_KEYS: FrozenSet[str] = frozenset(
+    key for key in re.split(r"[,\s]+", raw_keys) if key
+)
 
 if not VALID_API_KEYS:
     print("WARNING: No VALID_API_KEYS found in .env. Authorization will not work.")
-    VALID_API_KEYS = ["fallback_dummy_token_for_dev_only"]
+    VALID_API_KEYS = frozenset({"fallback_dummy_token_for_dev_only"})
 
 
-async def get_api_key(api_key: str = Security(api_key_header)):
-    if api_key in VALID_API_KEYS:
-        return api_key
-    else:
-        raise HTTPException(status_code=403, detail="Could not validate credentials")
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8")).digest()
+
+
+# Keys are compared as fixed-size digests so timing reveals nothing about their content.
+_VALID_KEY_DIGESTS: FrozenSet[bytes] = frozenset(_digest(key) for key in VALID_API_KEYS)
+
+
+def _is_valid_api_key(api_key: str) -> bool:
+    digest = _digest(api_key)
+    valid = False
+    for known in _VALID_KEY_DIGESTS:
+        valid |= hmac.compare_digest(digest, known)
+    return valid
+
+
+def _make_get_api_key():
+    # FastAPI would expose extra default arguments as query parameters, so the
+    # hot-path names are bound in a closure (LOAD_DEREF) instead of looked up
+    # in the module globals on every request.
+    is_valid_api_key = _is_valid_api_key
+
+    async def get_api_key(api_key: str = Security(api_key_header)):
+        if is_valid_api_key(api_key):
+            return api_key
+        else:
+            raise HTTPException(
+                status_code=403, detail="Could not validate credentials"
+            )
+
+    return get_api_key
+
+
+get_api_key = _make_get_api_key()
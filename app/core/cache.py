@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import EMBEDDING_CACHE_SIZE, REDIS_CACHE_TTL, REDIS_URL
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional: only needed when REDIS_URL is set
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, bytes]
+Vector = Union[np.ndarray, List[float]]
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def content_digest(data: Union[str, bytes, BinaryIO]) -> bytes:
+    """Hashes text, raw bytes or a seekable file object (read in chunks, then rewound)."""
+    hasher = hashlib.blake2b(digest_size=16)
+    if isinstance(data, str):
+        hasher.update(data.encode("utf-8"))
+    elif isinstance(data, bytes):
+        hasher.update(data)
+    else:
+        data.seek(0)
+        for chunk in iter(lambda: data.read(_HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+        data.seek(0)
+    return hasher.digest()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of embeddings keyed by (model_name, kind, content digest).
+    Vectors are stored as float32 arrays, which is far more compact than lists of
+    Python floats, and hits return the stored (read-only) array without conversion.
+    A maxsize of 0 disables the cache.
+
+    With a `redis_url`, the async methods add a shared second tier: local misses
+    are looked up in Redis (float16 bytes with a TTL) and new entries are written
+    to both. Redis errors are logged and treated as misses.
+    """
+
+    def __init__(self, maxsize: int, redis_url: str = "", redis_ttl: int = 86400):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_url = redis_url
+        self._redis_ttl = redis_ttl
+        self._redis = None
+        if redis_url and aioredis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed.")
+
+    @staticmethod
+    def make_key(model_name: str, kind: str, digest: bytes) -> CacheKey:
+        return (model_name, kind, digest)
+
+    def get(self, key: CacheKey) -> Optional[np.ndarray]:
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is None:
+                return None
+            self._data.move_to_end(key)
+        return vector
+
+    def put(self, key: CacheKey, embedding: Vector) -> None:
+        if self.maxsize <= 0:
+            return
+        # Copy, so a cached row doesn't keep its whole batch array alive, and
+        # freeze it since the same array is handed out to every hit.
+        vector = np.array(embedding, dtype=np.float32)
+        vector.flags.writeable = False
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _redis_client(self):
+        if not self._redis_url or aioredis is None:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(self._redis_url)
+        return self._redis
+
+    @staticmethod
+    def _redis_key(key: CacheKey) -> str:
+        model_name, kind, digest = key
+        return f"emb:{model_name}:{kind}:{digest.hex()}"
+
+    async def aget_many(self, keys: Sequence[CacheKey]) -> List[Optional[np.ndarray]]:
+        """Looks keys up locally, then fetches the misses from Redis in one MGET."""
+        embeddings = [self.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        client = self._redis_client()
+        if not missing or client is None:
+            return embeddings
+
+        try:
+            values = await client.mget([self._redis_key(keys[i]) for i in missing])
+        except Exception as e:
+            logger.warning("Redis cache lookup failed: %s", e)
+            return embeddings
+        for i, value in zip(missing, values):
+            if value is not None:
+                embeddings[i] = np.frombuffer(value, dtype="<f2").astype(np.float32)
+                self.put(keys[i], embeddings[i])
+        return embeddings
+
+    async def aget(self, key: CacheKey) -> Optional[np.ndarray]:
+        return (await self.aget_many([key]))[0]
+
+    async def aput_many(
+        self, items: Sequence[Tuple[CacheKey, Vector]]
+    ) -> None:
+        for key, embedding in items:
+            self.put(key, embedding)
+        client = self._redis_client()
+        if not items or client is None:
+            return
+
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, embedding in items:
+                    pipe.set(
+                        self._redis_key(key),
+                        np.asarray(embedding, dtype="<f2").tobytes(),
+                        ex=self._redis_ttl,
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Redis cache write failed: %s", e)
+
+    async def aput(self, key: CacheKey, embedding: Vector) -> None:
+        await self.aput_many([(key, embedding)])
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+EMBEDDING_CACHE = EmbeddingCache(EMBEDDING_CACHE_SIZE, REDIS_URL, REDIS_CACHE_TTL)
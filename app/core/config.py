@@ -1,3 +1,93 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
 APP_VERSION = "0.2.0"
 SERVICE_NAME = "Embeddings Service"
-MODEL_CACHE_DIR = "./model_cache"
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "./model_cache")
+
+# Set EMBEDDINGS_DEBUG=1 to enable debug-level logging.
+DEBUG = os.getenv("EMBEDDINGS_DEBUG") == "1"
+
+# Which models run a dummy forward pass after preloading:
+# "all", "none", or a comma-separated list of model names.
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "all")
+
+# Maximum number of model inference calls running at the same time.
+INFERENCE_CONCURRENCY = int(os.getenv("INFERENCE_CONCURRENCY", "4"))
+
+# Micro-batching: concurrent requests arriving within BATCH_MAX_WAIT_MS are
+# coalesced into one forward pass of at most BATCH_MAX_SIZE inputs.
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "8"))
+
+# Texts per forward pass inside one encode call. sentence-transformers sorts
+# the inputs by length before splitting them into these mini-batches, so a
+# long outlier only pads the mini-batch it lands in.
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "32"))
+
+# Number of embeddings kept in the in-process LRU cache (0 disables it).
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMB_CACHE", "10000"))
+
+# Optional shared second cache tier (requires the `redis` package), e.g.
+# redis://localhost:6379/0. Entries expire after REDIS_CACHE_TTL seconds.
+REDIS_URL = os.getenv("REDIS_URL", "")
+REDIS_CACHE_TTL = int(os.getenv("REDIS_CACHE_TTL", "86400"))
+
+# Number of uvicorn worker processes started by `python -m app.server`.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Intra-op threads per forward pass for torch. 0 splits the CPU cores evenly
+# between the WEB_CONCURRENCY x INFERENCE_CONCURRENCY passes that can run at
+# once, so they don't oversubscribe the machine.
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))
+
+# Torch device the models run on, e.g. "cuda:1". Empty picks cuda when
+# available, else cpu. With several GPUs, run one worker per GPU instead.
+EMBEDDINGS_DEVICE = os.getenv("EMBEDDINGS_DEVICE", "")
+
+# Modalities served by this deployment; disabled models are never loaded and
+# their endpoints answer 503. Set e.g. ENABLE_MULTIMODAL=0 for text/image only.
+ENABLED_MODEL_TYPES = frozenset(
+    model_type
+    for model_type in ("text", "image", "multimodal")
+    if os.getenv(f"ENABLE_{model_type.upper()}", "1") == "1"
+)
+
+# Longest text accepted by the embedding endpoints; longer input gets a 413.
+MAX_TEXT_CHARS = int(os.getenv("MAX_TEXT_CHARS", "8192"))
+
+# Most texts accepted in one batched text request; larger lists get a 413.
+MAX_BATCH_TEXTS = int(os.getenv("MAX_BATCH_TEXTS", "256"))
+
+# Largest accepted image upload in bytes; bigger files are rejected with 413
+# before any decoding happens.
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(20 * 1024 * 1024)))
+
+# Inference backend for the text model: "torch", or "onnx"/"openvino" via
+# sentence-transformers (needs `pip install sentence-transformers[onnx]` or
+# `[openvino]`; the model is exported on first load if no export exists).
+TEXT_BACKEND = os.getenv("TEXT_BACKEND", "torch")
+# ONNX file to load for the onnx backend, relative to the model repo, e.g. the
+# int8 export "onnx/model_qint8_avx512_vnni.onnx". Empty uses the fp32 model.
+TEXT_ONNX_FILE = os.getenv("TEXT_ONNX_FILE", "")
+
+# Set IMAGE_INT8=1 to dynamically quantize the image model's Linear layers to
+# int8 on CPU: faster on CPUs with VNNI/AMX, slightly different embeddings.
+IMAGE_INT8 = os.getenv("IMAGE_INT8") == "1"
+
+# Same for the multimodal model, the largest of the three.
+MULTIMODAL_INT8 = os.getenv("MULTIMODAL_INT8") == "1"
+
+# Set IMAGE_COMPILE=1 to wrap the image model in torch.compile (Inductor).
+# Adds compile time to the first forward pass, which warmup absorbs.
+IMAGE_COMPILE = os.getenv("IMAGE_COMPILE") == "1"
+
+# Same for the multimodal model's transformer towers.
+MULTIMODAL_COMPILE = os.getenv("MULTIMODAL_COMPILE") == "1"
+
+# How ViT token states are reduced to one image embedding: "cls" takes the
+# [CLS] token (the pretraining readout), "mean" averages all patch tokens.
+IMAGE_POOLING = os.getenv("IMAGE_POOLING", "cls")
@@ -0,0 +1,29 @@
+import base64
+from typing import List, Union
+
+import numpy as np
+
+# Little-endian on the wire regardless of the host byte order.
+_NUMPY_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def encode_embedding(
+    embedding: Union[np.ndarray, List[float]],
+    dtype: str = "float32",
+    encoding: str = "list",
+) -> Union[np.ndarray, List[float], str]:
+    """
+    Converts an embedding to its wire format: a vector of floats, or the base64
+    of the raw little-endian `dtype` buffer. Clients decode the latter with
+    `np.frombuffer(base64.b64decode(value), dtype=np.float16)`.
+
+    For `list` the result stays a numpy array (or the given list for float32);
+    ORJSONResponse serializes arrays natively as a JSON list of floats.
+    """
+    if dtype == "float32" and encoding == "list" and isinstance(embedding, list):
+        return embedding
+
+    if encoding == "base64":
+        vector = np.asarray(embedding, dtype=_NUMPY_DTYPES[dtype])
+        return base64.b64encode(vector.tobytes()).decode("ascii")
+    return np.ascontiguousarray(embedding, dtype=dtype)
@@ -0,0 +1,80 @@
+import asyncio
+import contextlib
+from typing import BinaryIO, Iterator, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared session so repeated image downloads reuse pooled keep-alive
+# connections instead of paying a new TCP/TLS handshake per request.
+HTTP_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+HTTP_SESSION.mount("http://", _adapter)
+HTTP_SESSION.mount("https://", _adapter)
+
+@contextlib.contextmanager
+def open_url_stream(url: str, timeout: float = 10) -> Iterator[BinaryIO]:
+    """
+    Yields the (decompressed) body of `url` as a file-like stream, so decoders
+    read it directly instead of going through a fully materialized `bytes`.
+    Raises ValueError if the request fails.
+    """
+    try:
+        response = HTTP_SESSION.get(url, timeout=timeout, stream=True)
+    except requests.RequestException as e:
+        raise ValueError(f"Could not download image from URL: {url}. Error: {e}")
+    with response:
+        try:
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise ValueError(f"Could not download image from URL: {url}. Error: {e}")
+        response.raw.decode_content = True
+        yield response.raw
+
+
+# Async counterpart used by the endpoints, so image downloads don't occupy a
+# worker thread. Created lazily and closed from the application lifespan.
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=30.0,
+            follow_redirects=True,
+        )
+    return _ASYNC_CLIENT
+
+
+async def close_async_client() -> None:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+
+# Transient failures (connection errors, timeouts, 5xx) are retried with
+# exponential backoff: 0.25s, 0.5s, ...
+_FETCH_RETRIES = 2
+_FETCH_BACKOFF = 0.25
+
+
+async def fetch_bytes(url: str) -> bytes:
+    """Downloads `url` over the shared async client. Raises ValueError on failure."""
+    for attempt in range(_FETCH_RETRIES + 1):
+        try:
+            response = await get_async_client().get(url)
+            if response.status_code < 500 or attempt == _FETCH_RETRIES:
+                response.raise_for_status()
+                return response.content
+        except (httpx.TransportError, httpx.HTTPError, httpx.InvalidURL) as e:
+            transient = isinstance(e, httpx.TransportError) and not isinstance(
+                e, httpx.UnsupportedProtocol
+            )
+            if not transient or attempt == _FETCH_RETRIES:
+                raise ValueError(f"Could not download image from URL: {url}. Error: {e}")
+        await asyncio.sleep(_FETCH_BACKOFF * 2**attempt)
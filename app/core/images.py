@@ -0,0 +1,21 @@
+from typing import BinaryIO, Optional, Tuple
+
+from PIL import Image
+
+# Input resolution of the bundled ViT/CLIP models.
+DEFAULT_DECODE_SIZE: Tuple[int, int] = (224, 224)
+
+
+def decode_image(
+    stream: BinaryIO, min_size: Optional[Tuple[int, int]] = DEFAULT_DECODE_SIZE
+) -> Image.Image:
+    """
+    Decodes an image into RGB. For JPEGs, `min_size` lets libjpeg decode at a
+    reduced DCT scale that still covers the model input, which is much cheaper
+    than a full-resolution decode of a large photo followed by a resize.
+    Other formats ignore the hint.
+    """
+    image = Image.open(stream)
+    if min_size is not None:
+        image.draft("RGB", min_size)
+    return image.convert("RGB")
@@ -0,0 +1,21 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from app.core.config import INFERENCE_CONCURRENCY
+
+T = TypeVar("T")
+
+# Dedicated pool for model work: keeps inference from starving the default
+# executor (used by FastAPI for sync dependencies) and caps concurrent forward
+# passes at INFERENCE_CONCURRENCY.
+INFERENCE_POOL = ThreadPoolExecutor(
+    max_workers=INFERENCE_CONCURRENCY, thread_name_prefix="inference"
+)
+
+
+async def run_inference(func: Callable[..., T], *args: Any) -> T:
+    """Runs a blocking inference call on the inference pool so the event loop stays free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(INFERENCE_POOL, partial(func, *args))
@@ -0,0 +1,78 @@
+import contextlib
+import logging
+import os
+import threading
+from typing import Dict, Iterator, Union
+
+import torch
+
+from .config import (
+    EMBEDDINGS_DEVICE,
+    INFERENCE_CONCURRENCY,
+    TORCH_THREADS,
+    WEB_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+_CONFIGURE_LOCK = threading.Lock()
+_configured = False
+
+
+def configure_torch_threads() -> None:
+    """
+    Caps torch's thread pools once per process, before the first model loads.
+    Up to INFERENCE_CONCURRENCY forward passes share torch's intra-op pool size,
+    so workers x inference threads x torch threads is kept close to the number
+    of cores.
+    """
+    global _configured
+    with _CONFIGURE_LOCK:
+        if _configured:
+            return
+        _configured = True
+
+        parallel_passes = max(1, WEB_CONCURRENCY) * max(1, INFERENCE_CONCURRENCY)
+        num_threads = TORCH_THREADS or max(1, (os.cpu_count() or 1) // parallel_passes)
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError as e:
+            # Only allowed before any inter-op parallel work has started.
+            logger.warning("Could not set torch inter-op threads: %s", e)
+        logger.info("Torch configured with %s intra-op thread(s).", num_threads)
+
+
+def select_device() -> str:
+    """The device models load on: EMBEDDINGS_DEVICE, else cuda if available, else cpu."""
+    if EMBEDDINGS_DEVICE:
+        return EMBEDDINGS_DEVICE
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+_thread_streams = threading.local()
+
+
+@contextlib.contextmanager
+def compute_stream(device: Union[str, torch.device]) -> Iterator[None]:
+    """
+    Runs the enclosed CUDA work on a stream owned by the calling thread, so
+    forward passes from different inference threads overlap on the GPU instead
+    of serializing on the default stream. Work already queued on the current
+    stream (e.g. input decoding) is waited for first. A no-op off CUDA.
+    """
+    device = torch.device(device)
+    if device.type != "cuda":
+        yield
+        return
+
+    streams: Dict[torch.device, torch.cuda.Stream] = getattr(
+        _thread_streams, "streams", None
+    ) or {}
+    _thread_streams.streams = streams
+    stream = streams.get(device)
+    if stream is None:
+        stream = streams[device] = torch.cuda.Stream(device=device)
+    stream.wait_stream(torch.cuda.current_stream(device))
+    with torch.cuda.stream(stream):
+        yield
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key: while a call for a key is in
+    flight, later callers await the same task instead of starting their own.
+    A successful result stays available for `ttl` seconds after it completes;
+    failures are forgotten immediately so the next caller retries.
+
+    The shared task runs independently of its callers, so one client going
+    away doesn't cancel the work for the others.
+    """
+
+    def __init__(self, ttl: float = 0.0):
+        self.ttl = ttl
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        failed = task.cancelled() or task.exception() is not None
+        if failed or self.ttl <= 0:
+            self._forget(key, task)
+        else:
+            task.get_loop().call_later(self.ttl, self._forget, key, task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
@@ -0,0 +1,11 @@
+from .base_embedder import BaseEmbedder
+from .text_embedder import TextEmbedder
+from .image_embedder import ImageEmbedder
+from .multimodal_embedder import MultimodalEmbedder
+
+__all__ = [
+    "BaseEmbedder",
+    "TextEmbedder",
+    "ImageEmbedder",
+    "MultimodalEmbedder",
+]
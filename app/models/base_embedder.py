@@ -1,11 +1,25 @@
+import functools
+import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Any, List
+from types import MappingProxyType
+from typing import Any, ClassVar, List, Mapping, Optional
+
+import numpy as np
+
+from app.core.runtime import configure_torch_threads
+
+logger = logging.getLogger(__name__)
 
 
 class BaseEmbedder(ABC):
     """Abstract base class for all embedding models."""
 
+    model_type: ClassVar[str] = "unknown"
+    description: ClassVar[str] = "N/A"
+    # Embedding size of the class's default model, reported without loading it.
+    default_dimension: ClassVar[Optional[int]] = None
+
     def __init__(
         self, model_name: str, model_type: str, model_cache_dir: str = "./model_cache"
     ):
@@ -16,12 +30,17 @@ class BaseEmbedder(ABC):
 
         if self.model_cache_dir:
             os.makedirs(self.model_cache_dir, exist_ok=True)
-            print(f"Models will be cached in: {os.path.abspath(self.model_cache_dir)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Models will be cached in: %s",
+                    os.path.abspath(self.model_cache_dir),
+                )
         else:
-            print(
+            logger.info(
                 "Model cache directory not specified. Models will be downloaded to default Hugging Face cache."
             )
 
+        configure_torch_threads()
         self._load_model()
 
     @abstractmethod
@@ -34,12 +53,31 @@ class BaseEmbedder(ABC):
         """Generates an embedding for the input data. Must be implemented in subclasses."""
         pass
 
+    def get_embeddings(self, data: List[Any]) -> np.ndarray:
+        """
+        Generates embeddings for several inputs as a float32 array with one row per input.
+        Subclasses override this with a batched forward pass.
+        """
+        return np.asarray([self.get_embedding(item) for item in data], dtype=np.float32)
+
+    def warmup(self) -> None:
+        """Runs a dummy inference so the first real request doesn't pay one-off setup costs."""
+        self.get_embedding("warmup")
+
+    @functools.cached_property
+    def model_info(self) -> Mapping[str, Any]:
+        """Read-only model metadata, computed once per instance."""
+        return MappingProxyType(
+            {
+                "model_name": self.model_name,
+                "model_type": self.model_type,
+                "description": getattr(self, "description", "N/A"),
+                "dim": self.dimension,
+            }
+        )
+
     def get_model_info(self):
-        return {
-            "model_name": self.model_name,
-            "model_type": self.model_type,
-            "description": getattr(self, "description", "N/A"),
-        }
+        return dict(self.model_info)
 
     @property
     @abstractmethod
@@ -1,116 +1,276 @@
+import contextlib
+import logging
+import threading
+import numpy as np
 import torch
+from torchvision.io import ImageReadMode, decode_jpeg
 from transformers import AutoModel, AutoImageProcessor
 from PIL import Image
 from io import BytesIO
-import requests
-from typing import List, Union
+from app.core.config import IMAGE_COMPILE, IMAGE_INT8, IMAGE_POOLING
+from app.core.http import open_url_stream
+from app.core.images import DEFAULT_DECODE_SIZE, decode_image
+from app.core.runtime import compute_stream, select_device
+from typing import BinaryIO, ClassVar, List, Optional, Union
 from .base_embedder import BaseEmbedder
 
+logger = logging.getLogger(__name__)
+
+# Already-decoded pixels are accepted as HWC uint8 RGB arrays or CHW uint8 tensors.
+ImageSource = Union[bytes, str, BinaryIO, Image.Image, np.ndarray, torch.Tensor]
+# A decoded image: PIL on CPU, or a uint8 CHW tensor already on the GPU.
+DecodedImage = Union[Image.Image, torch.Tensor]
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+
 
 class ImageEmbedder(BaseEmbedder):
     """Class for image embeddings using Hugging Face Transformers."""
 
+    model_type: ClassVar[str] = "image"
     description = "Hugging Face ViT model for image embeddings."
+    default_dimension: ClassVar[int] = 768
 
     def __init__(
         self,
         model_name: str = "google/vit-base-patch16-224",
         model_cache_dir: str = "./model_cache",
     ):
-        print(
-            f"[DEBUG ImageEmbedder __init__] Instantiating with model_name: '{model_name}', cache_dir: '{model_cache_dir}'"
+        logger.debug(
+            "Instantiating ImageEmbedder with model_name: %s, cache_dir: %s",
+            model_name,
+            model_cache_dir,
         )
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = select_device()
+        self._on_cuda = torch.device(self.device).type == "cuda"
+        self._dimension = 0
+        self.processor = None
+        self._decode_size = DEFAULT_DECODE_SIZE
+        self._streams = threading.local()
         super().__init__(
             model_name=model_name, model_type="image", model_cache_dir=model_cache_dir
         )
-        self._dimension = 0
-        self.processor = None
 
     def _load_model(self):
-        print(
-            f"[DEBUG ImageEmbedder _load_model] Called for model: '{self.model_name}' with processor: {hasattr(self, 'processor') and self.processor is not None}"
-        )
-        print(
-            f"Loading image model: {self.model_name} on device: {self.device} from cache: {self.model_cache_dir}..."
+        logger.info(
+            "Loading image model: %s on device: %s from cache: %s...",
+            self.model_name,
+            self.device,
+            self.model_cache_dir,
         )
         try:
             self.processor = AutoImageProcessor.from_pretrained(
                 self.model_name, cache_dir=self.model_cache_dir
             )
+            # channels_last only affects 4D weights, i.e. the conv patch embedding.
             self.model = AutoModel.from_pretrained(
                 self.model_name, cache_dir=self.model_cache_dir
-            ).to(self.device)
-            print(
-                f"[DEBUG ImageEmbedder _load_model] Successfully loaded model and processor for: '{self.model_name}'"
+            ).to(self.device, memory_format=torch.channels_last)
+            logger.debug(
+                "Successfully loaded model and processor for: %s", self.model_name
             )
+            if IMAGE_INT8 and not self._on_cuda:
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logger.info("Image model %s quantized to int8.", self.model_name)
 
-            if hasattr(self.model.config, "hidden_size"):
-                self._dimension = self.model.config.hidden_size
-            else:
-                dummy_image = Image.new(
-                    "RGB", (self.processor.size["height"], self.processor.size["width"])
+            size = getattr(self.processor, "size", None) or {}
+            if "height" in size and "width" in size:
+                self._decode_size = (size["width"], size["height"])
+            # Normalization constants for on-device preprocessing, shaped for NCHW.
+            self._rescale_factor = getattr(self.processor, "rescale_factor", 1 / 255)
+            self._norm_mean = torch.tensor(
+                getattr(self.processor, "image_mean", [0.5, 0.5, 0.5]),
+                device=self.device,
+            ).view(1, -1, 1, 1)
+            self._norm_std = torch.tensor(
+                getattr(self.processor, "image_std", [0.5, 0.5, 0.5]),
+                device=self.device,
+            ).view(1, -1, 1, 1)
+
+            config = self.model.config.to_dict()
+            self._dimension = config.get("hidden_size") or config.get("projection_dim")
+            if not self._dimension:
+                raise RuntimeError(
+                    f"Image model {self.model_name} config has no hidden_size or projection_dim."
                 )
-                inputs = self.processor(images=dummy_image, return_tensors="pt").to(
-                    self.device
+
+            if IMAGE_COMPILE:
+                # Compiles lazily on the first forward pass, i.e. during warmup.
+                self.model = torch.compile(
+                    self.model, mode="reduce-overhead", dynamic=True
                 )
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
-                    dummy_embedding = outputs.last_hidden_state
-                self._dimension = dummy_embedding.shape[-1]
 
-            print(f"Image model {self.model_name} loaded. Dimension: {self._dimension}")
+            logger.info(
+                "Image model %s loaded. Dimension: %s", self.model_name, self._dimension
+            )
         except Exception as e:
-            print(
-                f"[DEBUG ImageEmbedder _load_model] Error loading Hugging Face model {self.model_name}: {e}"
+            logger.error(
+                "Error loading Hugging Face model %s: %s",
+                self.model_name,
+                e,
+                exc_info=True,
             )
             self.model = None
             self.processor = None
             raise
 
-    def get_embedding(self, image_source: Union[bytes, str]) -> List[float]:
-        if self.model is None or self.processor is None:
-            raise RuntimeError(f"Image model {self.model_name} is not loaded properly.")
+    def _autocast(self):
+        """Half-precision autocast on CUDA (bf16 where supported); a no-op on CPU."""
+        if not self._on_cuda:
+            return contextlib.nullcontext()
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        return torch.autocast(device_type="cuda", dtype=dtype)
+
+    def load_image(self, image_source: ImageSource) -> DecodedImage:
+        """
+        Downloads/decodes an image source into an RGB PIL image. On CUDA, JPEGs
+        are decoded by nvJPEG straight into a uint8 tensor on the GPU instead,
+        and raw pixel arrays/tensors are uploaded as-is.
+        """
+        if isinstance(image_source, Image.Image):
+            return image_source.convert("RGB")
+        if isinstance(image_source, torch.Tensor):
+            return image_source.to(self.device) if self._on_cuda else image_source
+        if isinstance(image_source, np.ndarray):
+            # HWC uint8 RGB pixels are uploaded as-is; anything else (grayscale,
+            # RGBA, float) is normalised by PIL, exactly as on CPU.
+            if (
+                self._on_cuda
+                and image_source.ndim == 3
+                and image_source.shape[-1] == 3
+                and image_source.dtype == np.uint8
+            ):
+                return torch.from_numpy(image_source).permute(2, 0, 1).to(self.device)
+            return Image.fromarray(image_source).convert("RGB")
 
-        image_bytes: bytes
+        image_stream: BinaryIO
         if isinstance(image_source, str):
-            try:
-                response = requests.get(image_source, timeout=10)
-                response.raise_for_status()
-                image_bytes = response.content
-            except requests.RequestException as e:
-                raise ValueError(
-                    f"Could not download image from URL: {image_source}. Error: {e}"
-                )
+            with open_url_stream(image_source) as image_stream:
+                return self._decode_stream(image_stream)
         elif isinstance(image_source, bytes):
-            image_bytes = image_source
+            image_stream = BytesIO(image_source)
+        elif hasattr(image_source, "read"):
+            # File-like objects (e.g. an upload's SpooledTemporaryFile) are decoded
+            # by PIL directly, without buffering the whole payload first.
+            image_stream = image_source
         else:
-            raise TypeError("image_source must be bytes (file content) or str (URL).")
+            raise TypeError(
+                "image_source must be bytes (file content), a file-like object or str (URL)."
+            )
+        return self._decode_stream(image_stream)
+
+    def _decode_stream(self, image_stream: BinaryIO) -> DecodedImage:
+        if self._on_cuda:
+            data = image_stream.read()
+            decoded = self._decode_jpeg_on_gpu(data)
+            if decoded is not None:
+                return decoded
+            image_stream = BytesIO(data)
 
         try:
-            image = Image.open(BytesIO(image_bytes)).convert("RGB")
+            return decode_image(image_stream, self._decode_size)
         except Exception as e:
             raise ValueError(f"Could not open image. Error: {e}")
 
-        inputs = self.processor(images=image, return_tensors="pt").to(self.device)
+    def _decode_jpeg_on_gpu(self, data: bytes) -> Optional[torch.Tensor]:
+        """nvJPEG decode; None for non-JPEG data or anything nvJPEG rejects."""
+        if not data.startswith(_JPEG_MAGIC):
+            return None
+        try:
+            return decode_jpeg(
+                torch.frombuffer(bytearray(data), dtype=torch.uint8),
+                mode=ImageReadMode.RGB,
+                device=self.device,
+            )
+        except RuntimeError as e:
+            logger.debug("nvJPEG could not decode image, falling back to PIL: %s", e)
+            return None
+
+    def _to_device(self, image: DecodedImage) -> torch.Tensor:
+        """
+        Uploads a PIL image to the model device as a uint8 CHW tensor. The host
+        buffer is pinned so the copy is a true async DMA on the current stream.
+        """
+        if isinstance(image, torch.Tensor):
+            return image
+        host = torch.from_numpy(np.asarray(image)).pin_memory()
+        return host.to(self.device, non_blocking=True).permute(2, 0, 1)
+
+    def _copy_stream(self) -> "torch.cuda.Stream":
+        """Per-thread side stream for uploads, so they overlap other threads' compute."""
+        stream = getattr(self._streams, "copy", None)
+        if stream is None:
+            stream = self._streams.copy = torch.cuda.Stream(device=self.device)
+        return stream
+
+    def _resize_on_device(self, image: torch.Tensor) -> torch.Tensor:
+        """Resizes a uint8 CHW tensor to the model input size, on its device."""
+        width, height = self._decode_size
+        return torch.nn.functional.interpolate(
+            image.unsqueeze(0).float(),
+            size=(height, width),
+            mode="bilinear",
+            align_corners=False,
+            antialias=True,
+        )[0]
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+    def _pixel_values(self, images: List[DecodedImage]) -> torch.Tensor:
+        """
+        Builds the batch's pixel_values on the model device. On CUDA, images are
+        uploaded as uint8 (4x fewer bytes than float32) and resized/normalized
+        there; on CPU the HF processor does the work.
+        """
+        if not self._on_cuda:
+            return self.processor(images=images, return_tensors="pt")["pixel_values"]
 
-        embedding = outputs.last_hidden_state.mean(dim=1)
+        copy_stream = self._copy_stream()
+        with torch.cuda.stream(copy_stream):
+            uploaded = [self._to_device(image) for image in images]
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(copy_stream)
+        for tensor in uploaded:
+            # Keep the caching allocator from reusing the memory while in use here.
+            tensor.record_stream(compute_stream)
 
-        return embedding.cpu().numpy().squeeze().tolist()
+        resized = torch.stack([self._resize_on_device(image) for image in uploaded])
+        return (resized * self._rescale_factor - self._norm_mean) / self._norm_std
+
+    def get_embeddings(self, image_sources: List[ImageSource]) -> np.ndarray:
+        """Embeds several images with a single forward pass."""
+        if self.model is None or self.processor is None:
+            raise RuntimeError(f"Image model {self.model_name} is not loaded properly.")
+
+        images = [self.load_image(source) for source in image_sources]
+
+        with compute_stream(self.device):
+            with torch.inference_mode(), self._autocast():
+                pixel_values = self._pixel_values(images).contiguous(
+                    memory_format=torch.channels_last
+                )
+                outputs = self.model(pixel_values=pixel_values)
+
+            # Pool in float32 even when the forward pass ran in half precision.
+            if IMAGE_POOLING == "mean":
+                embeddings = outputs.last_hidden_state.float().mean(dim=1)
+            else:
+                embeddings = outputs.last_hidden_state[:, 0].float()
+
+            return np.ascontiguousarray(embeddings.cpu().numpy())
+
+    def get_embedding(self, image_source: ImageSource) -> List[float]:
+        return self.get_embeddings([image_source])[0].tolist()
+
+    def warmup(self) -> None:
+        dummy_image = Image.new("RGB", (224, 224))
+        image_bytes = BytesIO()
+        dummy_image.save(image_bytes, format="PNG")
+        self.get_embedding(image_bytes.getvalue())
 
     @property
     def dimension(self) -> int:
-        if self._dimension == 0 and self.model is not None:
-            if hasattr(self.model.config, "hidden_size"):
-                self._dimension = self.model.config.hidden_size
-            else:
-                raise RuntimeError(
-                    f"Image model {self.model_name} is loaded, but dimension could not be determined from config."
-                )
-        elif self.model is None and self._dimension == 0:
+        if self.model is None:
             raise RuntimeError(
                 f"Image model {self.model_name} is not loaded, dimension unknown."
             )
@@ -1,10 +1,16 @@
+import contextlib
 import logging
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 from PIL import Image, UnidentifiedImageError
 from io import BytesIO
-import requests
-from typing import List, Union, Any
-from app.models.base_embedder import BaseEmbedder
+from app.core.config import ENCODE_BATCH_SIZE, MULTIMODAL_COMPILE, MULTIMODAL_INT8
+from app.core.http import open_url_stream
+from app.core.images import decode_image
+from app.core.runtime import compute_stream, select_device
+from typing import BinaryIO, ClassVar, List, Union
+from .base_embedder import BaseEmbedder
 
 logger = logging.getLogger(__name__)
 
@@ -12,21 +18,26 @@ logger = logging.getLogger(__name__)
 class MultimodalEmbedder(BaseEmbedder):
     """Class for multimodal embeddings using SentenceTransformer (CLIP models)."""
 
+    model_type: ClassVar[str] = "multimodal"
     description = (
         "Sentence Transformer CLIP model for multimodal (text/image) embeddings."
     )
+    default_dimension: ClassVar[int] = 512
 
     def __init__(
         self,
         model_name: str = "sentence-transformers/clip-ViT-B-32-multilingual-v1",
         model_cache_dir: str = "./model_cache",
+        half_precision: bool = True,
     ):
+        self._dimension = 0
+        # fp16 autocast on CUDA; CPU inference stays fp32.
+        self.half_precision = half_precision
         super().__init__(
             model_name=model_name,
             model_type="multimodal",
             model_cache_dir=model_cache_dir,
         )
-        self._dimension = 0
 
     def _load_model(self):
         logger.info(
@@ -34,9 +45,23 @@ class MultimodalEmbedder(BaseEmbedder):
         )
         try:
             self.model = SentenceTransformer(
-                self.model_name, cache_folder=self.model_cache_dir
+                self.model_name,
+                cache_folder=self.model_cache_dir,
+                device=select_device(),
+            )
+            # Resolved once here; CLIP modules may not report a dimension, in
+            # which case it is measured from a dummy encode.
+            self._dimension = self.model.get_sentence_embedding_dimension() or len(
+                self.model.encode("test")
             )
-            self._dimension = self.model.get_sentence_embedding_dimension()
+            if MULTIMODAL_INT8 and self.model.device.type == "cpu":
+                # In place, so the fp32 weights aren't held twice while converting.
+                torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                )
+                logger.info("Multimodal model %s quantized to int8.", self.model_name)
+            if MULTIMODAL_COMPILE:
+                self._compile_towers()
             logger.info(
                 f"Multimodal model {self.model_name} loaded. Dimension: {self._dimension}"
             )
@@ -48,64 +73,87 @@ class MultimodalEmbedder(BaseEmbedder):
             self.model = None
             raise
 
-    def get_embedding(self, data: Union[str, Image.Image]) -> List[float]:
+    def _compile_towers(self):
+        # Only the transformer towers are compiled; pooling and the projection
+        # head are cheap. Compilation happens lazily on the first forward pass,
+        # i.e. during warmup. dynamic=True because micro-batching varies the
+        # batch size and texts vary in length.
+        def compile_module(module):
+            return torch.compile(module, mode="reduce-overhead", dynamic=True)
+
+        for module in self.model:
+            if hasattr(module, "auto_model"):
+                module.auto_model = compile_module(module.auto_model)
+            elif hasattr(getattr(module, "model", None), "vision_model"):
+                clip = module.model
+                clip.vision_model = compile_module(clip.vision_model)
+                clip.text_model = compile_module(clip.text_model)
+
+    def _autocast(self):
+        # Autocast rather than .half(): the CLIP image module receives float32
+        # pixel values, which a half-precision conv would reject.
+        if self.half_precision and self.model.device.type == "cuda":
+            return torch.autocast(device_type="cuda", dtype=torch.float16)
+        return contextlib.nullcontext()
+
+    def get_embeddings(self, data: List[Union[str, Image.Image]]) -> np.ndarray:
+        """Embeds several texts and/or images with a single encode call."""
         if self.model is None:
             raise RuntimeError(
                 f"Multimodal model {self.model_name} is not loaded properly."
             )
 
-        try:
-            if isinstance(data, str):
-                embeddings = self.model.encode([data])
-                embedding = embeddings[0]
-            elif isinstance(data, Image.Image):
-                embeddings = self.model.encode([data])
-                embedding = embeddings[0]
-            else:
+        for item in data:
+            if not isinstance(item, (str, Image.Image)):
                 raise TypeError("Input data must be a string or a PIL Image.")
 
-            return embedding.tolist()
+        try:
+            with compute_stream(self.model.device), self._autocast():
+                embeddings = self.model.encode(data, batch_size=ENCODE_BATCH_SIZE)
+            return np.asarray(embeddings, dtype=np.float32)
+        except (TypeError, ValueError):
+            # Bad input is the caller's error, not an unavailable model.
+            raise
         except Exception as e:
             logger.error(f"Error during model encoding: {e}", exc_info=True)
             raise RuntimeError(f"Failed to get embedding: {e}")
 
+    def get_embedding(self, data: Union[str, Image.Image]) -> List[float]:
+        return self.get_embeddings([data])[0].tolist()
+
+    def warmup(self) -> None:
+        self.get_embedding("warmup")
+        self.get_embedding(Image.new("RGB", (224, 224)))
+
     @property
     def dimension(self) -> int:
         if self.model is None:
             raise RuntimeError(
                 f"Multimodal model {self.model_name} is not loaded, dimension unknown."
             )
-        if self._dimension == 0 and self.model is not None:
-            try:
-                self._dimension = self.model.get_sentence_embedding_dimension()
-            except Exception as e:
-                logger.error(f"Could not get embedding dimension: {e}", exc_info=True)
-                raise RuntimeError(f"Could not determine model dimension: {e}")
         return self._dimension
 
-    def _load_image_from_source(self, image_source: Union[bytes, str]) -> Image.Image:
-        image_bytes: bytes
+    def _load_image_from_source(
+        self, image_source: Union[bytes, str, BinaryIO]
+    ) -> Image.Image:
+        image_stream: BinaryIO
         if isinstance(image_source, str):
-            try:
-                response = requests.get(image_source, timeout=10)
-                response.raise_for_status()
-                image_bytes = response.content
-            except requests.RequestException as e:
-                logger.error(
-                    f"Could not download image from URL: {image_source}. Error: {e}",
-                    exc_info=True,
-                )
-                raise ValueError(
-                    f"Could not download image from URL: {image_source}. Error: {e}"
-                )
+            with open_url_stream(image_source) as image_stream:
+                return self._decode_stream(image_stream)
         elif isinstance(image_source, bytes):
-            image_bytes = image_source
+            image_stream = BytesIO(image_source)
+        elif hasattr(image_source, "read"):
+            # Uploads are decoded straight from their spooled file.
+            image_stream = image_source
         else:
-            raise TypeError("image_source must be bytes (file content) or str (URL).")
+            raise TypeError(
+                "image_source must be bytes (file content), a file-like object or str (URL)."
+            )
+        return self._decode_stream(image_stream)
 
+    def _decode_stream(self, image_stream: BinaryIO) -> Image.Image:
         try:
-            image = Image.open(BytesIO(image_bytes)).convert("RGB")
-            return image
+            return decode_image(image_stream)
         except UnidentifiedImageError as e:
             logger.error(
                 f"Invalid image file content or unsupported format. Error: {e}",
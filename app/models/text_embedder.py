@@ -1,52 +1,139 @@
+import logging
+import numpy as np
+import torch
+import torch.nn.functional as F
 from sentence_transformers import SentenceTransformer
-from typing import List
+from sentence_transformers.models import Normalize, Pooling, Transformer
+from typing import ClassVar, List
+from app.core.config import ENCODE_BATCH_SIZE, TEXT_BACKEND, TEXT_ONNX_FILE
+from app.core.runtime import compute_stream, select_device
 from .base_embedder import BaseEmbedder
 
+logger = logging.getLogger(__name__)
+
 
 class TextEmbedder(BaseEmbedder):
     """Class for text embeddings using SentenceTransformer."""
 
+    model_type: ClassVar[str] = "text"
     description = "Sentence Transformer model for text embeddings."
+    default_dimension: ClassVar[int] = 384
 
     def __init__(
         self,
         model_name: str = "all-MiniLM-L6-v2",
         model_cache_dir: str = "./model_cache",
+        half_precision: bool = True,
     ):
+        self._dimension = 0
+        # Set in _load_model when encode() reduces to tokenizer + backbone +
+        # mean pooling (+ L2 normalization), see _encode_direct.
+        self._direct = False
+        self._normalize = False
+        # fp16 weights and activations on CUDA; CPU inference stays fp32.
+        self.half_precision = half_precision
         super().__init__(
             model_name=model_name, model_type="text", model_cache_dir=model_cache_dir
         )
-        self._dimension = 0
 
     def _load_model(self):
-        print(
-            f"Loading text model: {self.model_name} from cache: {self.model_cache_dir}..."
+        logger.info(
+            "Loading text model: %s (%s backend) from cache: %s...",
+            self.model_name,
+            TEXT_BACKEND,
+            self.model_cache_dir,
         )
         try:
+            backend_kwargs = {} if TEXT_BACKEND == "torch" else {"backend": TEXT_BACKEND}
+            if TEXT_BACKEND == "onnx" and TEXT_ONNX_FILE:
+                backend_kwargs["model_kwargs"] = {"file_name": TEXT_ONNX_FILE}
             self.model = SentenceTransformer(
-                self.model_name, cache_folder=self.model_cache_dir
+                self.model_name,
+                cache_folder=self.model_cache_dir,
+                device=select_device(),
+                **backend_kwargs,
             )
+            on_cuda = self.model.device.type == "cuda"
+            if self.half_precision and TEXT_BACKEND == "torch" and on_cuda:
+                self.model.half()
+            self._direct, self._normalize = self._direct_path_layout()
             dummy_embedding = self.model.encode("test")
             self._dimension = dummy_embedding.shape[0]
-            print(f"Text model {self.model_name} loaded. Dimension: {self._dimension}")
+            logger.info(
+                "Text model %s loaded. Dimension: %s", self.model_name, self._dimension
+            )
         except Exception as e:
-            print(f"Error loading SentenceTransformer model {self.model_name}: {e}")
+            logger.error(
+                "Error loading SentenceTransformer model %s: %s",
+                self.model_name,
+                e,
+                exc_info=True,
+            )
             self.model = None
             raise
 
+    def _direct_path_layout(self):
+        """
+        Returns (direct, normalize): whether the model is a plain torch
+        Transformer -> mean Pooling [-> Normalize] stack that _encode_direct
+        reproduces, and whether it ends with L2 normalization.
+        """
+        modules = list(self.model)
+        direct = (
+            TEXT_BACKEND == "torch"
+            and len(modules) in (2, 3)
+            and isinstance(modules[0], Transformer)
+            and isinstance(modules[1], Pooling)
+            and modules[1].get_pooling_mode_str() == "mean"
+            and (len(modules) == 2 or isinstance(modules[2], Normalize))
+        )
+        return direct, direct and len(modules) == 3
+
+    def _encode_direct(self, texts: List[str]) -> np.ndarray:
+        """
+        Same result as encode() for one mini-batch, without its per-call
+        wrapper work (length sort and restore, feature dict plumbing, per-module
+        dispatch), which dominates for the small batches typical at low load.
+        """
+        transformer = self.model[0]
+        features = transformer.tokenize(texts)
+        features = {
+            name: features[name].to(self.model.device)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in features
+        }
+        with torch.inference_mode():
+            hidden = transformer.auto_model(**features, return_dict=True).last_hidden_state
+            # Pool in float32 even when the backbone ran in half precision, so
+            # long sequences don't lose precision in the masked sum.
+            hidden = hidden.float()
+            mask = features["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            if self._normalize:
+                embeddings = F.normalize(embeddings, p=2, dim=1)
+        return embeddings.cpu().numpy()
+
     def get_embedding(self, text: str) -> List[float]:
+        return self.get_embeddings([text])[0].tolist()
+
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds several texts. Up to one mini-batch goes straight through the
+        backbone when the model layout allows it; larger batches use encode(),
+        which length-sorts them into ENCODE_BATCH_SIZE chunks.
+        """
         if self.model is None:
             raise RuntimeError(f"Text model {self.model_name} is not loaded properly.")
-        embedding = self.model.encode(text)
-        return embedding.tolist()
+        with compute_stream(self.model.device):
+            if self._direct and len(texts) <= ENCODE_BATCH_SIZE:
+                return self._encode_direct(texts)
+            embeddings = self.model.encode(texts, batch_size=ENCODE_BATCH_SIZE)
+        return np.asarray(embeddings, dtype=np.float32)
 
     @property
     def dimension(self) -> int:
         if self.model is None:
-
             raise RuntimeError(
                 f"Text model {self.model_name} is not loaded, dimension unknown."
             )
         return self._dimension
-
-
@@ -1,14 +1,33 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
+
+EmbeddingDType = Literal["float32", "float16"]
+EmbeddingEncoding = Literal["list", "base64"]
 
 
 class TextRequest(BaseModel):
-    text: str = Field(..., example="This is an example text for getting an embedding.")
+    text: Union[str, List[str]] = Field(
+        ...,
+        example="This is an example text for getting an embedding.",
+        description="A text, or a list of texts to embed in one batch",
+    )
     model_name: Optional[str] = Field(
         None,
         example="all-MiniLM-L6-v2",
         description="Optional: specify a specific text model if there are several",
     )
+    dtype: EmbeddingDType = Field(
+        "float32",
+        description="Precision of the returned embedding: float32 or float16",
+    )
+    encoding: EmbeddingEncoding = Field(
+        "list",
+        description="list returns JSON floats, base64 returns the raw little-endian buffer",
+    )
+    stream: bool = Field(
+        False,
+        description="For a list of texts: stream results as NDJSON lines while later chunks are still computing",
+    )
 
 
 class ImageUrlRequest(BaseModel):
@@ -18,18 +37,31 @@ class ImageUrlRequest(BaseModel):
         example="ViT-B/32",
         description="Optional: specify a specific image model if there are several",
     )
+    dtype: EmbeddingDType = Field(
+        "float32",
+        description="Precision of the returned embedding: float32 or float16",
+    )
+    encoding: EmbeddingEncoding = Field(
+        "list",
+        description="list returns JSON floats, base64 returns the raw little-endian buffer",
+    )
 
 
 class EmbeddingResponse(BaseModel):
-    embedding: List[float]
+    # `embedding` is set for single inputs, `embeddings` for batched text input.
+    embedding: Optional[Union[List[float], str]] = None
+    embeddings: Optional[List[Union[List[float], str]]] = None
     model_used: str
     dim: int
+    dtype: EmbeddingDType = "float32"
+    encoding: EmbeddingEncoding = "list"
 
 
 class ModelInfo(BaseModel):
     model_name: str
     model_type: str
     description: Optional[str] = None
+    dim: Optional[int] = None
 
 
 class AvailableModelsResponse(BaseModel):
@@ -0,0 +1,17 @@
+import uvicorn
+
+from app.core.config import WEB_CONCURRENCY
+
+
+def main() -> None:
+    """Production entrypoint: `python -m app.server`."""
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=WEB_CONCURRENCY,
+    )
+
+
+if __name__ == "__main__":
+    main()
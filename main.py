@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from fastapi import (
@@ -5,13 +6,17 @@ from fastapi import (
     Depends,
     HTTPException,
 )
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import (
     Optional,
 )
 import traceback
 from contextlib import asynccontextmanager
 
+from app.core.config import DEBUG
+from app.core.cache import EMBEDDING_CACHE
+from app.core.http import close_async_client
 from app.auth import (
     get_api_key,
 )
@@ -22,6 +27,7 @@ from app import (
     get_default_image_model_name,
     get_available_models_info,
     preload_models,
+    stop_batchers,
 )
 
 from app.api.v1 import text as api_text_v1
@@ -31,7 +37,7 @@ from app.api.v1 import multimodal as api_multimodal_v1
 
 
 logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    level=logging.DEBUG if DEBUG else logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
@@ -40,12 +46,23 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Actions on application startup and shutdown, e.g. preloading models."""
     logger.info("Application startup...")
+    # Models load and warm up in the background so /health answers right away;
+    # /readiness reports when they are done.
+    app.state.preload_task = asyncio.create_task(preload_models())
+    logger.info("Application started, models are loading in the background.")
+    yield
+    # Stop a preload that is still running before tearing down what it uses.
+    preload_task = app.state.preload_task
+    preload_task.cancel()
     try:
-        preload_models()
+        await preload_task
+    except asyncio.CancelledError:
+        pass
     except Exception as e:
         logger.error(f"Error during model preloading: {e}", exc_info=True)
-    logger.info("Application ready.")
-    yield
+    await stop_batchers()
+    await close_async_client()
+    await EMBEDDING_CACHE.aclose()
     logger.info("Application shutdown.")
 
 
@@ -54,8 +71,13 @@ app = FastAPI(
     description="API for getting text and image embeddings.",
     version="0.2.0",
     lifespan=lifespan,
+    # Embedding vectors are long float lists; orjson serializes them in C.
+    default_response_class=ORJSONResponse,
 )
 
+# Embedding payloads compress well; small responses are sent as-is.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
 app.include_router(api_text_v1.router, prefix="/v1", tags=["V1 - Text Embeddings"])
 app.include_router(api_image_v1.router, prefix="/v1", tags=["V1 - Image Embeddings"])
 app.include_router(api_models_v1.router, prefix="/v1", tags=["V1 - Models"])
@@ -83,6 +105,24 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/readiness", tags=["General"])
+async def readiness_check():
+    preload_task = getattr(app.state, "preload_task", None)
+    if preload_task is None or not preload_task.done():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+
+    try:
+        failures = preload_task.result()
+    except Exception as e:
+        logger.error(f"Error during model preloading: {e}", exc_info=True)
+        failures = {"preload": str(e)}
+
+    return {
+        "status": "ready",
+        "warnings": [f"{name}: {error}" for name, error in failures.items()],
+    }
+
+
 import uvicorn
 
 if __name__ == "__main__":
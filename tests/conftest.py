@@ -0,0 +1,110 @@
+import logging
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+# Pin the model cache to one absolute directory before the app reads its
+# config, so every pytest-xdist worker (`pytest -n auto`) resolves the same
+# Hugging Face cache whatever its working directory. Each worker still loads
+# its own copy through the session fixtures below, but only the first one
+# downloads; the hub's file locks serialise concurrent fetches. An exported
+# SENTENCE_TRANSFORMERS_HOME is reused so checkouts on one machine share a
+# single copy; otherwise it is the repo's model_cache, as used by the service.
+os.environ.setdefault(
+    "MODEL_CACHE_DIR",
+    os.environ.get("SENTENCE_TRANSFORMERS_HOME")
+    or str(Path(__file__).resolve().parent.parent / "model_cache"),
+)
+
+from app import get_embedder_instance  # noqa: E402
+from main import app  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# The embedder fixtures come from the app's model registry, so the API tests
+# and the direct embedder tests share one loaded copy of each model per run.
+
+
+def _preload_text_model():
+    try:
+        get_embedder_instance("all-MiniLM-L6-v2")
+    except Exception as e:
+        # Leave the failure to the tests that need the model.
+        logger.warning("Could not pre-load the text model: %s", e)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "slow: loads ML models; deselect with -m 'not slow'"
+    )
+
+
+def pytest_sessionstart(session):
+    # Warm the model cache before any test needs it. In a plain run the load
+    # happens on a background thread so it overlaps collection; fixtures that
+    # ask the registry for the model block on its per-model lock until it is
+    # ready. The xdist controller loads synchronously instead, so workers find
+    # the files on disk rather than racing each other to the Hub.
+    if hasattr(session.config, "workerinput"):
+        return
+    if "not slow" in (session.config.option.markexpr or ""):
+        return  # the model-loading tests are deselected
+    if getattr(session.config.option, "numprocesses", None):
+        _preload_text_model()
+    else:
+        threading.Thread(
+            target=_preload_text_model, name="preload-text-model", daemon=True
+        ).start()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    # Drives the ASGI app in-process on the test's event loop. Models load
+    # lazily on first use, so the lifespan's background preload isn't needed.
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def text_embedder():
+    return get_embedder_instance("all-MiniLM-L6-v2")
+
+
+@pytest.fixture(scope="session")
+def image_embedder():
+    return get_embedder_instance("google/vit-base-patch16-224")
+
+
+@pytest.fixture(scope="session")
+def multimodal_embedder():
+    try:
+        instance = get_embedder_instance(
+            "sentence-transformers/clip-ViT-B-32-multilingual-v1"
+        )
+        if instance.model is None:
+            pytest.skip(
+                "Failed to load multimodal model, skipping tests that require it."
+            )
+        return instance
+    except Exception as e:
+        pytest.skip(
+            f"Skipping multimodal embedder tests due to model loading error: {e}"
+        )
+
+
+@pytest.fixture
+def tmp_cache_dir(tmp_path):
+    """An empty model cache directory, for tests that check what a load writes."""
+    cache_dir = tmp_path / "model_cache"
+    cache_dir.mkdir()
+    return str(cache_dir)
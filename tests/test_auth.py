@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import auth
+
+
+def test_configured_key_is_accepted():
+    key = next(iter(auth.VALID_API_KEYS))
+
+    assert auth._is_valid_api_key(key)
+
+
+def test_unknown_key_is_rejected():
+    assert not auth._is_valid_api_key("definitely-not-a-configured-key")
+    assert not auth._is_valid_api_key("")
+
+
+def test_dependency_returns_a_valid_key():
+    key = next(iter(auth.VALID_API_KEYS))
+
+    assert asyncio.run(auth.get_api_key(key)) == key
+
+
+def test_dependency_rejects_an_unknown_key():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(auth.get_api_key("definitely-not-a-configured-key"))
+    assert excinfo.value.status_code == 403
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.models.batcher import MicroBatcher
+
+
+def test_concurrent_submits_are_coalesced_into_one_batch():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(len(items))
+        return items
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert max(calls) <= 2
+
+
+def test_batch_errors_are_propagated_to_every_caller():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=10)
+        try:
+            return await asyncio.gather(
+                batcher.submit(1), batcher.submit(2), return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+
+    assert len(results) == 2
+    assert all(isinstance(r, ValueError) for r in results)
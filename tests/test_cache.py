@@ -0,0 +1,56 @@
+from io import BytesIO
+
+import numpy as np
+
+from app.core.cache import EmbeddingCache, content_digest
+
+
+def test_cache_returns_stored_embedding():
+    cache = EmbeddingCache(maxsize=4)
+    key = cache.make_key("model", "text", content_digest("hello"))
+
+    assert cache.get(key) is None
+    cache.put(key, [0.5, 0.25])
+    assert cache.get(key).tolist() == [0.5, 0.25]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(maxsize=2)
+    keys = [cache.make_key("model", "text", content_digest(str(i))) for i in range(3)]
+
+    cache.put(keys[0], [0.0])
+    cache.put(keys[1], [1.0])
+    cache.get(keys[0])
+    cache.put(keys[2], [2.0])
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).tolist() == [0.0]
+    assert len(cache) == 2
+
+
+def test_zero_maxsize_disables_cache():
+    cache = EmbeddingCache(maxsize=0)
+    key = cache.make_key("model", "text", content_digest("hello"))
+    cache.put(key, [1.0])
+
+    assert cache.get(key) is None
+
+
+def test_content_digest_of_stream_matches_bytes_and_rewinds():
+    stream = BytesIO(b"image-bytes")
+
+    assert content_digest(stream) == content_digest(b"image-bytes")
+    assert stream.read() == b"image-bytes"
+
+
+def test_cache_stores_a_read_only_copy():
+    cache = EmbeddingCache(maxsize=4)
+    key = cache.make_key("model", "text", content_digest("hello"))
+    batch = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
+
+    cache.put(key, batch[0])
+    batch[0, 0] = 0.0
+
+    cached = cache.get(key)
+    assert cached.tolist() == [1.0, 2.0]
+    assert not cached.flags.writeable
@@ -0,0 +1,28 @@
+import base64
+
+import numpy as np
+
+from app.core.encoding import encode_embedding
+
+
+def test_default_encoding_returns_list_unchanged():
+    embedding = [0.1, 0.2, 0.3]
+
+    assert encode_embedding(embedding) is embedding
+
+
+def test_base64_float16_round_trips():
+    embedding = [0.5, -1.25, 2.0]
+
+    encoded = encode_embedding(embedding, dtype="float16", encoding="base64")
+    decoded = np.frombuffer(base64.b64decode(encoded), dtype="<f2")
+
+    assert isinstance(encoded, str)
+    assert decoded.tolist() == embedding
+
+
+def test_float16_list_is_quantized():
+    encoded = encode_embedding([0.1], dtype="float16", encoding="list")
+
+    assert encoded.dtype == np.float16
+    assert encoded.tolist() == [float(np.float16(0.1))]
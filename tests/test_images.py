@@ -0,0 +1,31 @@
+from io import BytesIO
+
+from PIL import Image
+
+from app.core.images import decode_image
+
+
+def _encode(image: Image.Image, format: str) -> BytesIO:
+    buffer = BytesIO()
+    image.save(buffer, format=format)
+    buffer.seek(0)
+    return buffer
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale_covering_min_size():
+    stream = _encode(Image.new("RGB", (2000, 1600), "red"), "JPEG")
+
+    image = decode_image(stream, (224, 224))
+
+    assert image.mode == "RGB"
+    assert image.width < 2000 and image.height < 1600
+    assert image.width >= 224 and image.height >= 224
+
+
+def test_non_jpeg_is_decoded_at_full_size():
+    stream = _encode(Image.new("L", (600, 400)), "PNG")
+
+    image = decode_image(stream, (224, 224))
+
+    assert image.mode == "RGB"
+    assert image.size == (600, 400)
@@ -1,134 +1,133 @@
+import contextlib
+import huggingface_hub
 import pytest
 from PIL import Image
 import numpy as np
-import os
-import requests
 from io import BytesIO
+from app.models import multimodal_embedder as multimodal_embedder_module
 from app.models.multimodal_embedder import MultimodalEmbedder
 
-MODEL_CACHE_DIR = "./test_model_cache"
-if not os.path.exists(MODEL_CACHE_DIR):
-    os.makedirs(MODEL_CACHE_DIR)
+pytestmark = pytest.mark.slow
 
 
-@pytest.fixture(scope="module")
-def embedder():
-    try:
-        instance = MultimodalEmbedder(model_cache_dir=MODEL_CACHE_DIR)
-        if instance.model is None:
-            pytest.skip(
-                "Failed to load multimodal model, skipping tests that require it."
-            )
-        return instance
-    except Exception as e:
-        pytest.skip(
-            f"Skipping multimodal embedder tests due to model loading error: {e}"
-        )
+def _bmp_bytes(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="BMP")
+    return buffer.getvalue()
+
 
+_GREEN_50X50_BMP = _bmp_bytes(Image.new("RGB", (50, 50), color="green"))
+_RED_150_BMP = _bmp_bytes(Image.new("RGB", (150, 150), color="red"))
 
-def test_multimodal_embedder_init(embedder):
-    assert embedder is not None
-    assert embedder.model_name == "sentence-transformers/clip-ViT-B-32-multilingual-v1"
-    assert embedder.model_type == "multimodal"
-    assert embedder.model is not None, "Model should be loaded."
-    assert embedder.dimension > 0, "Dimension should be set and greater than 0."
+
+def test_multimodal_embedder_init(multimodal_embedder):
+    assert multimodal_embedder is not None
+    assert (
+        multimodal_embedder.model_name
+        == "sentence-transformers/clip-ViT-B-32-multilingual-v1"
+    )
+    assert multimodal_embedder.model_type == "multimodal"
+    assert multimodal_embedder.model is not None, "Model should be loaded."
+    assert (
+        multimodal_embedder.dimension > 0
+    ), "Dimension should be set and greater than 0."
 
 
-def test_multimodal_embedder_dimension_property(embedder):
-    dim = embedder.dimension
+def test_multimodal_embedder_dimension_property(multimodal_embedder):
+    dim = multimodal_embedder.dimension
     assert isinstance(dim, int)
     assert dim > 0
     assert dim == 512, f"Expected dimension 512, got {dim}"
 
 
-def test_multimodal_text_embedding(embedder):
-    test_text = "Это тестовый текст для эмбеддинга."
-    embedding = embedder.get_embedding(test_text)
+@pytest.mark.parametrize(
+    "make_input",
+    [
+        lambda: "Это тестовый текст для эмбеддинга.",
+        lambda: Image.new("RGB", (60, 30), color="red"),
+    ],
+    ids=["text", "image"],
+)
+def test_multimodal_embedding_shape(multimodal_embedder, make_input):
+    embedding = multimodal_embedder.get_embedding(make_input())
 
     assert isinstance(embedding, list), "Embedding should be a list."
-    assert (
-        len(embedding) == embedder.dimension
-    ), f"Embedding length {len(embedding)} should match model dimension {embedder.dimension}."
-    assert all(
-        isinstance(x, float) for x in embedding
-    ), "All elements in embedding should be floats."
-
+    vector = np.asarray(embedding)
+    assert vector.dtype == np.float64, "All elements in embedding should be floats."
+    assert vector.shape == (
+        multimodal_embedder.dimension,
+    ), f"Embedding length {len(embedding)} should match model dimension {multimodal_embedder.dimension}."
 
-def test_multimodal_image_embedding(embedder):
-    try:
-        img = Image.new("RGB", (60, 30), color="red")
-    except ImportError:
-        pytest.skip("Pillow is not installed, skipping image embedding test.")
 
-    embedding = embedder.get_embedding(img)
-
-    assert isinstance(embedding, list), "Image embedding should be a list."
-    assert (
-        len(embedding) == embedder.dimension
-    ), f"Image embedding length {len(embedding)} should match model dimension {embedder.dimension}."
-    assert all(
-        isinstance(x, float) for x in embedding
-    ), "All elements in image embedding should be floats."
-
-
-def test_multimodal_embedding_consistency(embedder):
+def test_multimodal_embedding_consistency(multimodal_embedder):
+    # Identical inputs in one batch must agree, and a separate call must
+    # reproduce them; the tolerance allows for kernels picked per batch shape.
     text1 = "Hello world"
-    embedding1 = np.array(embedder.get_embedding(text1))
-    embedding2 = np.array(embedder.get_embedding(text1))
+    embedding1, embedding2 = multimodal_embedder.get_embeddings([text1, text1])
+    separate_text = np.asarray(multimodal_embedder.get_embedding(text1))
 
     assert np.allclose(
         embedding1, embedding2, atol=1e-6
     ), "Embeddings for the same text should be very close."
+    assert np.allclose(
+        embedding1, separate_text, atol=1e-5
+    ), "A separate call should reproduce the text embedding."
 
-    try:
-        img1 = Image.new("RGB", (100, 100), color="blue")
-        img2 = Image.new("RGB", (100, 100), color="blue")
-    except ImportError:
-        pytest.skip("Pillow is not installed, skipping image consistency test.")
-
-    embedding_img1 = np.array(embedder.get_embedding(img1))
-    embedding_img2 = np.array(embedder.get_embedding(img2))
+    img1 = Image.new("RGB", (100, 100), color="blue")
+    img2 = Image.new("RGB", (100, 100), color="blue")
+    embedding_img1, embedding_img2 = multimodal_embedder.get_embeddings([img1, img2])
+    separate_img = np.asarray(multimodal_embedder.get_embedding(img1))
 
     assert np.allclose(
         embedding_img1, embedding_img2, atol=1e-6
     ), "Embeddings for the same image should be very close."
+    assert np.allclose(
+        embedding_img1, separate_img, atol=1e-5
+    ), "A separate call should reproduce the image embedding."
 
 
-def test_load_image_from_url(embedder):
+def test_load_image_from_url(multimodal_embedder, monkeypatch):
     image_url = "https://via.placeholder.com/150/FF0000/FFFFFF?Text=TestImage"
+    requested = []
+
+    @contextlib.contextmanager
+    def fake_open_url_stream(url, timeout=10):
+        # Served in-process, so the test doesn't depend on the network.
+        requested.append(url)
+        yield BytesIO(_RED_150_BMP)
+
+    monkeypatch.setattr(
+        multimodal_embedder_module, "open_url_stream", fake_open_url_stream
+    )
     try:
-        pil_image = embedder._load_image_from_source(image_url)
+        pil_image = multimodal_embedder._load_image_from_source(image_url)
+        assert requested == [image_url]
         assert isinstance(pil_image, Image.Image)
-        embedding = embedder.get_embedding(pil_image)
-        assert len(embedding) == embedder.dimension
-    except requests.exceptions.RequestException as e:
-        pytest.skip(
-            f"Skipping image URL test due to network issue or placeholder not available: {e}"
-        )
+        embedding = multimodal_embedder.get_embedding(pil_image)
+        assert len(embedding) == multimodal_embedder.dimension
     except ValueError as e:
         pytest.fail(f"Image loading from URL failed: {e}")
 
 
-def test_load_image_from_bytes(embedder):
+def test_load_image_from_bytes(multimodal_embedder):
     try:
-        img = Image.new("RGB", (50, 50), color="green")
-        byte_io = BytesIO()
-        img.save(byte_io, format="PNG")
-        image_bytes = byte_io.getvalue()
-
-        pil_image = embedder._load_image_from_source(image_bytes)
+        pil_image = multimodal_embedder._load_image_from_source(_GREEN_50X50_BMP)
         assert isinstance(pil_image, Image.Image)
-        embedding = embedder.get_embedding(pil_image)
-        assert len(embedding) == embedder.dimension
-    except ImportError:
-        pytest.skip("Pillow/BytesIO not available, skipping image bytes test.")
+        embedding = multimodal_embedder.get_embedding(pil_image)
+        assert len(embedding) == multimodal_embedder.dimension
     except ValueError as e:
         pytest.fail(f"Image loading from bytes failed: {e}")
 
 
-def test_multimodal_embedder_invalid_model_name():
+def test_multimodal_embedder_invalid_model_name(tmp_cache_dir, monkeypatch):
+    # Offline, the lookup fails straight from the empty cache instead of waiting
+    # on a 404 from the Hub. huggingface_hub reads the variable at import, so the
+    # constant is patched too.
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    monkeypatch.setenv("TRANSFORMERS_OFFLINE", "1")
+    monkeypatch.setattr(huggingface_hub.constants, "HF_HUB_OFFLINE", True)
     with pytest.raises(Exception):
         MultimodalEmbedder(
             model_name="invalid-model-path/non-existent-model",
-            model_cache_dir=MODEL_CACHE_DIR,
+            model_cache_dir=tmp_cache_dir,
         )
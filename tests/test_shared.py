@@ -0,0 +1,21 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import _shared
+from app.core.config import MAX_BATCH_TEXTS
+
+
+def test_batch_at_the_limit_is_accepted():
+    _shared.check_text_batch(["text"] * MAX_BATCH_TEXTS)
+
+
+def test_batch_over_the_limit_is_rejected_with_413():
+    with pytest.raises(HTTPException) as excinfo:
+        _shared.check_text_batch(["text"] * (MAX_BATCH_TEXTS + 1))
+    assert excinfo.value.status_code == 413
+
+
+def test_blank_text_in_a_batch_is_rejected_with_400():
+    with pytest.raises(HTTPException) as excinfo:
+        _shared.check_text_batch(["text", "   "])
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+
+
+def test_result_is_reused_within_ttl():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        flights = SingleFlight(ttl=60.0)
+        first = await flights.do("key", fetch)
+        second = await flights.do("key", fetch)
+        return first, second
+
+    assert asyncio.run(main()) == (1, 1)
+
+
+def test_failure_is_not_cached():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        return "ok"
+
+    async def main():
+        flights = SingleFlight(ttl=60.0)
+        with pytest.raises(ValueError):
+            await flights.do("key", fetch)
+        await asyncio.sleep(0)
+        return await flights.do("key", fetch)
+
+    assert asyncio.run(main()) == "ok"